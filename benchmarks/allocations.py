@@ -0,0 +1,68 @@
+"""
+Measures the memory allocated by one render of every case of `cases.py`, as the
+peak traced by `tracemalloc`, and compares it to `allocations.json`. From the
+repository root::
+
+    python benchmarks/allocations.py
+    python benchmarks/allocations.py --update
+
+Cases allocating more than `--threshold` percent above the baseline are reported
+and make the command fail.
+"""
+import argparse
+import json
+import os
+import sys
+import tracemalloc
+
+from cases import get_cases
+
+BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'allocations.json')
+
+
+def measure(render):
+    # The first render fills the template and render plan caches
+    render()
+    tracemalloc.start()
+    try:
+        render()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--update', action='store_true', help='Write the measures as the new baseline')
+    parser.add_argument('--threshold', type=float, default=10, help='Tolerated increase, in percent')
+    args = parser.parse_args()
+
+    measures = dict((name, measure(build_case()) // 1024) for name, build_case in get_cases().items())
+    if args.update:
+        with open(BASELINE, 'w') as baseline_file:
+            json.dump(measures, baseline_file, indent=4, sort_keys=True)
+            baseline_file.write('\n')
+        return 0
+
+    with open(BASELINE) as baseline_file:
+        baseline = json.load(baseline_file)
+
+    regressions = 0
+    print('%-28s %12s %12s %8s' % ('case', 'baseline KiB', 'KiB', 'change'))
+    for name in sorted(measures):
+        before, after = baseline.get(name), measures[name]
+        if not before:
+            print('%-28s %12s %12d %8s' % (name, '-', after, 'new'))
+            continue
+        change = (after - before) * 100.0 / before
+        flag = ''
+        if change > args.threshold:
+            regressions += 1
+            flag = ' !'
+        print('%-28s %12d %12d %+7.1f%%%s' % (name, before, after, change, flag))
+
+    return 1 if regressions else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,31 @@
+"""
+Times rendering every case of `cases.py` with pyperf. From the repository root::
+
+    python benchmarks/bench_render.py --fast -o results.json
+    python -m pyperf compare_to benchmarks/baseline.json results.json --table
+
+Only run some cases by passing their names, like `div-small fieldset-huge`. The
+baseline is refreshed by writing to `benchmarks/baseline.json` instead.
+"""
+import pyperf
+
+from cases import get_cases
+
+
+def add_cmdline_args(cmd, args):
+    cmd.extend(args.cases)
+
+
+def main():
+    runner = pyperf.Runner(add_cmdline_args=add_cmdline_args)
+    runner.argparser.add_argument('cases', nargs='*', help='Names of the cases to run, all of them by default')
+    args = runner.parse_args()
+
+    for name, build_case in get_cases().items():
+        if args.cases and name not in args.cases:
+            continue
+        runner.bench_func(name, build_case())
+
+
+if __name__ == '__main__':
+    main()
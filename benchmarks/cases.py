@@ -0,0 +1,125 @@
+"""
+Render benchmark cases, shared by `bench_render.py` and `allocations.py`.
+
+Every layout object is benchmarked on small, medium and huge forms, built by
+repeating the fields of `SampleForm` and `CheckboxesSampleForm` from the test
+suite, and the formset templates on formsets of `SampleForm` of matching sizes. Choice
+rendering is benchmarked on a field of 5,000 choices, 1,000 of them selected.
+"""
+import copy
+import os
+import sys
+from collections import OrderedDict
+from importlib import import_module
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'crispy-forms-bootstrap2.tests.test_settings')
+
+import django  # isort:skip
+from django.conf import settings  # isort:skip
+
+# The test settings install crispy_forms first, whose templates would shadow the
+# ones of the app being benchmarked
+settings.TEMPLATES[0]['DIRS'] = [
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'crispy-forms-bootstrap2', 'templates'),
+]
+django.setup()
+
+from django import forms  # isort:skip
+from django.forms.formsets import formset_factory  # isort:skip
+
+from crispy_forms.helper import FormHelper  # isort:skip
+from crispy_forms.utils import render_crispy_form  # isort:skip
+
+layout = import_module('crispy-forms-bootstrap2.layout')
+test_forms = import_module('crispy-forms-bootstrap2.tests.forms')
+
+# Copies of the sample fields in a form, or forms in a formset
+SIZES = OrderedDict([('small', 1), ('medium', 10), ('huge', 100)])
+
+FORMSET_TEMPLATES = ('table_inline_formset', 'whole_uni_formset')
+
+# Choices of the large choice fields, and how many of them are selected
+CHOICES = 5000
+SELECTED_CHOICES = 1000
+
+
+def build_form_class(copies):
+    fields = OrderedDict()
+    for i in range(copies):
+        for form_class in (test_forms.SampleForm, test_forms.CheckboxesSampleForm):
+            for name, field in form_class.base_fields.items():
+                fields['%s_%s' % (name, i)] = copy.deepcopy(field)
+    return type('BenchmarkForm%s' % copies, (forms.Form,), fields)
+
+
+def inputs(input_class):
+    return lambda names: [input_class(name, 'Save {{ form.prefix }}') for name in names]
+
+
+# Layouts of every layout object, given the names of the fields of the form
+LAYOUTS = OrderedDict([
+    ('div', lambda names: [layout.Div(*names, css_class='benchmark')]),
+    ('row', lambda names: [layout.Row(*names)]),
+    ('column', lambda names: [layout.Column(*names)]),
+    ('fieldset', lambda names: [layout.Fieldset('Legend {{ form.prefix }}', *names)]),
+    ('multifield', lambda names: [
+        layout.MultiField('Label', *names, field_template='%s/layout/multifield.html')
+    ]),
+    ('buttonholder', lambda names: [layout.ButtonHolder(*inputs(layout.Submit)(names))]),
+    ('field', lambda names: [layout.Field(name, css_class='benchmark', data_name=name) for name in names]),
+    ('multiwidgetfield', lambda names: [
+        layout.MultiWidgetField(name, attrs=({'class': 'date'}, {'class': 'time'}))
+        if name.startswith('datetime_field') else name
+        for name in names
+    ]),
+    ('html', lambda names: [layout.HTML('<p>{{ form.%s.label }}</p>' % name) for name in names] + list(names)),
+    ('submit', inputs(layout.Submit)),
+    ('button', inputs(layout.Button)),
+    ('reset', inputs(layout.Reset)),
+    ('hidden', inputs(layout.Hidden)),
+])
+
+
+def layout_case(build_layout, copies):
+    form = build_form_class(copies)()
+    form.helper = FormHelper()
+    form.helper.layout = layout.Layout(*build_layout(list(form.fields)))
+    return lambda: render_crispy_form(form)
+
+
+def formset_case(template, copies):
+    formset = formset_factory(test_forms.SampleForm, extra=copies)()
+    helper = FormHelper()
+    helper.template = 'bootstrap/%s.html' % template
+    return lambda: render_crispy_form(formset, helper)
+
+
+def choices_case(widget):
+    form_class = type('BenchmarkChoicesForm', (forms.Form,), {
+        'choices': forms.MultipleChoiceField(
+            choices=[(i, 'Choice %s' % i) for i in range(CHOICES)],
+            widget=widget,
+        ),
+    })
+    form = form_class(initial={'choices': list(range(0, CHOICES, CHOICES // SELECTED_CHOICES))})
+    form.helper = FormHelper()
+    return lambda: render_crispy_form(form)
+
+
+def get_cases():
+    """
+    Returns an ordered mapping of case names to functions building the render
+    function of the case.
+    """
+    cases = OrderedDict()
+    for size, copies in SIZES.items():
+        for name, build_layout in LAYOUTS.items():
+            cases['%s-%s' % (name, size)] = (layout_case, build_layout, copies)
+        for template in FORMSET_TEMPLATES:
+            cases['%s-%s' % (template, size)] = (formset_case, template, copies)
+    cases['checkboxselectmultiple-%s' % CHOICES] = (choices_case, forms.CheckboxSelectMultiple)
+
+    return OrderedDict(
+        (name, (lambda case=case: case[0](*case[1:]))) for name, case in cases.items()
+    )
@@ -0,0 +1,74 @@
+"""
+Compares rendering a layout of fieldsets sequentially and with `parallel_render`,
+for growing fieldset sizes, to find from which subtree size rendering on the
+thread pool pays off. Run from the repository root::
+
+    DJANGO_SETTINGS_MODULE=crispy-forms-bootstrap2.tests.test_settings \\
+        python benchmarks/parallel_rendering.py
+"""
+import os
+import sys
+import timeit
+from importlib import import_module
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import django  # isort:skip
+django.setup()
+
+from django import forms  # isort:skip
+
+from crispy_forms.helper import FormHelper  # isort:skip
+from crispy_forms.utils import render_crispy_form  # isort:skip
+
+layout = import_module('crispy-forms-bootstrap2.layout')
+
+FIELDSETS = 4
+SIZES = (5, 10, 20, 40, 80, 160)
+
+# Speedup below which a difference is taken as noise
+MIN_SPEEDUP = 0.9
+
+
+def build_form(fieldsets, size):
+    names = ['field_%s_%s' % (i, j) for i in range(fieldsets) for j in range(size)]
+    Form = type('BenchmarkForm', (forms.Form,), dict((name, forms.CharField()) for name in names))
+
+    form = Form()
+    form.helper = FormHelper()
+    form.helper.layout = layout.Layout(*[
+        layout.Fieldset('Fieldset %s' % i, *names[i * size:(i + 1) * size]) for i in range(fieldsets)
+    ])
+    return form
+
+
+def time_render(form, parallel, number):
+    form.helper.parallel_render = parallel
+    return min(timeit.repeat(lambda: render_crispy_form(form), number=number, repeat=3)) / number
+
+
+def main():
+    from django.conf import settings
+    settings.CRISPY_PARALLEL_RENDER_MIN_FIELDS = 1
+
+    print('%d fieldsets, %s workers' % (FIELDSETS, getattr(settings, 'CRISPY_PARALLEL_RENDER_WORKERS', None) or 'default'))
+    print('%-16s %14s %14s %8s' % ('fields/fieldset', 'sequential ms', 'parallel ms', 'ratio'))
+    crossover = None
+    for size in SIZES:
+        form = build_form(FIELDSETS, size)
+        number = max(1, 200 // size)
+        sequential = time_render(form, False, number)
+        parallel = time_render(form, True, number)
+        ratio = parallel / sequential
+        if crossover is None and ratio < MIN_SPEEDUP:
+            crossover = size
+        print('%-16d %14.2f %14.2f %8.2f' % (size, sequential * 1000, parallel * 1000, ratio))
+
+    if crossover is None:
+        print('No crossover: parallel rendering is never more than %d%% faster' % round((1 - MIN_SPEEDUP) * 100))
+    else:
+        print('Crossover: %d fields per fieldset' % crossover)
+
+
+if __name__ == '__main__':
+    main()
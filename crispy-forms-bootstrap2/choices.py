@@ -0,0 +1,115 @@
+from django.conf import settings
+from django.forms.models import ModelChoiceIterator
+from django.utils.html import conditional_escape
+from django.utils.safestring import mark_safe
+
+from crispy_forms.utils import flatatt
+
+# Classes of the labels of the choices, by input type
+CHOICE_LABEL_CLASSES = {'radio': 'radio', 'checkbox': 'checkbox'}
+
+# Rows fetched at a time from the queryset of a model choice field, unless set by
+# `CRISPY_CHOICES_CHUNK_SIZE`
+CHOICES_CHUNK_SIZE = 2000
+
+CHOICE_TEMPLATE = (
+    '<label for="%(id)s" class="%(label_class)s">'
+    '<input type="%(input_type)s"%(checked)s name="%(name)s" id="%(id)s" value="%(value)s"%(attrs)s>%(label)s'
+    '</label>'
+)
+
+# Wraps the choices of a group, under a header of its name
+CHOICE_GROUP_TEMPLATE = '<div class="choice-group"><strong class="choice-group-label">%s</strong>%s</div>'
+
+
+def get_selected_values(field):
+    """
+    Returns the values of `field`'s choices that are selected, normalised to a set of
+    strings once per field so checking each choice is a set lookup. Strings and single
+    values make a one value set, any other iterable a value each.
+    """
+    value = field.value()
+    if value is None:
+        return {''}
+    if isinstance(value, (str, bytes)) or not hasattr(value, '__iter__'):
+        return {str(value)}
+    return {str(item) for item in value}
+
+
+def iter_model_choices(form_field):
+    """
+    Yields the choices of a `ModelChoiceField` as `ModelChoiceIterator` does, fetching
+    the rows of its queryset in chunks without keeping the instances around.
+    """
+    if form_field.empty_label is not None:
+        yield '', form_field.empty_label
+    queryset = form_field.queryset
+    # Like `ModelChoiceIterator`, prefetched querysets can't be iterated in chunks
+    if not queryset._prefetch_related_lookups:
+        queryset = queryset.iterator(chunk_size=getattr(settings, 'CRISPY_CHOICES_CHUNK_SIZE', CHOICES_CHUNK_SIZE))
+    for obj in queryset:
+        yield str(form_field.prepare_value(obj)), form_field.label_from_instance(obj)
+
+
+def get_choices(field):
+    """
+    Returns the choices of `field`. Those of model choice fields are read from their
+    queryset once per form, in chunks, and kept as values and labels, so rendering
+    the field again doesn't query the database again.
+    """
+    form_field = field.field
+    choices = form_field.choices
+    if not isinstance(choices, ModelChoiceIterator):
+        return choices
+
+    cached = form_field.__dict__.get('_crispy_choices')
+    if cached is None or cached[0] is not form_field.queryset:
+        # Custom iterators may change the choices, they're only cached
+        if type(choices) is ModelChoiceIterator:
+            choices = iter_model_choices(form_field)
+        cached = form_field.__dict__['_crispy_choices'] = (form_field.queryset, list(choices))
+    return cached[1]
+
+
+def render_choices(field, input_type, inline_class=None):
+    """
+    Renders a `<label><input></label>` per choice of `field`, as `radioselect.html`
+    and `checkboxselectmultiple.html` lay them out. What every choice shares, the
+    selected values, the widget attributes and the escaped name, is computed once.
+
+    Grouped choices are rendered in the same pass, each group under a header, and
+    numbered on from the choices before them.
+    """
+    name = conditional_escape(field.html_name)
+    values = {
+        'input_type': input_type,
+        'name': name,
+        'label_class': CHOICE_LABEL_CLASSES[input_type] + (' %s' % inline_class if inline_class else ''),
+        'attrs': flatatt(field.field.widget.attrs),
+    }
+    selected = get_selected_values(field)
+    counter = 0
+
+    def render_choice(value, label):
+        value = str(value)
+        values.update(
+            id='id_%s_%s' % (name, counter),
+            checked=' checked="checked"' if value in selected else '',
+            value=conditional_escape(value),
+            label=conditional_escape(str(label)),
+        )
+        return CHOICE_TEMPLATE % values
+
+    rendered = []
+    for value, label in get_choices(field):
+        if isinstance(label, (list, tuple)):
+            group = []
+            for choice_value, choice_label in label:
+                counter += 1
+                group.append(render_choice(choice_value, choice_label))
+            rendered.append(CHOICE_GROUP_TEMPLATE % (conditional_escape(str(value)), ''.join(group)))
+        else:
+            counter += 1
+            rendered.append(render_choice(value, label))
+
+    return mark_safe(''.join(rendered))
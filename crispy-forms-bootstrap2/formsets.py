@@ -0,0 +1,494 @@
+import os
+import threading
+from collections import OrderedDict
+
+from django import forms
+from django.conf import settings
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+from django.forms.formsets import (
+    INITIAL_FORM_COUNT, MAX_NUM_FORM_COUNT, MIN_NUM_FORM_COUNT, TOTAL_FORM_COUNT, ManagementForm,
+)
+from django.utils.functional import cached_property
+from django.utils.html import conditional_escape
+from django.utils.safestring import mark_safe
+from django.utils.translation import get_language
+
+from crispy_forms.exceptions import FormHelpersException
+from crispy_forms.helper import FormHelper
+from crispy_forms.templatetags.crispy_forms_tags import ForLoopSimulator
+from crispy_forms.templatetags.crispy_forms_utils import remove_spaces
+
+from .utils import get_node_context, get_template_pack, resolve_template
+
+# Formset templates that can be streamed, with the templates rendering their
+# opening part, each of their forms and their closing part
+STREAMING_TEMPLATES = {
+    '%s/table_inline_formset.html': (
+        '%s/table_inline_formset_start.html',
+        '%s/table_inline_formset_row.html',
+        '%s/table_inline_formset_end.html',
+    ),
+    '%s/whole_uni_formset.html': (
+        '%s/whole_uni_formset_start.html',
+        '%s/display_form.html',
+        '%s/whole_uni_formset_end.html',
+    ),
+}
+
+# Ways of rendering the empty form of `table_inline_formset.html`
+EMPTY_FORM_ROW = 'row'
+EMPTY_FORM_TEMPLATE = 'template'
+
+EMPTY_FORM_CACHE_SIZE = 256
+
+# Modules of the formset and model form factories, whose classes are built per call
+FACTORY_MODULES = ('django.forms.formsets', 'django.forms.models')
+
+_empty_form_templates = OrderedDict()
+
+_empty_form_templates_lock = threading.Lock()
+
+# The app's own `field.html`, the only one cells built in Python match
+FIELD_TEMPLATE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'templates', 'bootstrap', 'field.html')
+
+# Widget classes added by `{% crispy_field %}`, on top of `CRISPY_CLASS_CONVERTERS`
+CLASS_CONVERTERS = {
+    'textinput': 'textinput textInput',
+    'fileinput': 'fileinput fileUpload',
+    'passwordinput': 'textinput textInput',
+}
+
+
+def get_streaming_templates(helper, template_pack):
+    """
+    Returns the names of the start, form and end templates streaming the formset
+    template used by `helper`, raising `FormHelpersException` if it can't be streamed.
+    """
+    template = getattr(helper, 'template', None) or '%s/whole_uni_formset.html' % template_pack
+    for formset_template, partials in STREAMING_TEMPLATES.items():
+        if template == formset_template % template_pack:
+            return [partial % template_pack for partial in partials]
+
+    raise FormHelpersException(
+        "Formset template %s can't be streamed, only %s can" % (
+            template, ', '.join(sorted(name % template_pack for name in STREAMING_TEMPLATES))
+        )
+    )
+
+
+def get_formset_context(formset, helper, context, template_pack):
+    """
+    Returns the `Context` rendering `formset` with `helper`, holding the same
+    variables as the one built by `{% crispy %}`.
+    """
+    node_context = get_node_context(helper, context, template_pack, is_formset=True)
+    node_context.update({'is_bound': formset.is_bound, 'formset': formset})
+    return node_context
+
+
+def render_chunk(template, context, values):
+    with context.push(values):
+        html = template.template.render(context)
+    return mark_safe(remove_spaces(html.strip()))
+
+
+def get_formset_rendering(formset, helper, context, template_pack):
+    """
+    Returns the helper, the start, form and end templates, the context and whether
+    layouts are rendered, used to stream `formset`.
+    """
+    if helper is None:
+        helper = FormHelper() if not hasattr(formset, 'helper') else formset.helper
+    template_pack = getattr(helper, 'template_pack', None) or template_pack or get_template_pack()
+
+    template_names = get_streaming_templates(helper, template_pack)
+    templates = [resolve_template(name, template_pack) for name in template_names]
+    node_context = get_formset_context(formset, helper, context, template_pack)
+    # Layouts are only output by `display_form.html`, table rows render the fields
+    render_layout = bool(helper.layout) and template_names[1].endswith('/display_form.html')
+    if render_layout:
+        helper.render_hidden_fields = True
+
+    return helper, template_pack, templates, node_context, render_layout
+
+
+def iter_rendered_forms(formset, helper, template_pack, form_template, context, render_layout):
+    forloop = ForLoopSimulator(formset)
+    for form in formset:
+        if render_layout:
+            with context.push(forloop=forloop, formset_form=form):
+                form.form_html = helper.render_layout(form, context, template_pack=template_pack)
+            forloop.iterate()
+
+        yield render_chunk(form_template, context, {'form': form})
+
+        # Rendered layouts are not kept around once output
+        if render_layout:
+            del form.form_html
+
+
+def stream_formset(formset, helper=None, context=None, template_pack=None):
+    """
+    Renders `formset` as `{% crispy formset helper %}` does, but yields its HTML
+    piece by piece: the form tag, management form and table header first, then one
+    piece per form, a table row when using `table_inline_formset.html`, and finally
+    the inputs and closing tags. Forms are rendered as they are consumed, so the
+    output can be sent with a `StreamingHttpResponse`::
+
+        def formset_view(request):
+            formset = ItemFormSet(queryset=Item.objects.all())
+            return StreamingHttpResponse(stream_formset(
+                formset, helper, context={'csrf_token': get_token(request)}
+            ))
+
+    Only `table_inline_formset.html` and `whole_uni_formset.html` can be streamed.
+    `formset` can be a `FormsetWindow`, to only render some of its forms.
+    """
+    helper, template_pack, templates, node_context, render_layout = get_formset_rendering(
+        formset, helper, context, template_pack
+    )
+    start_template, form_template, end_template = templates
+
+    yield render_chunk(start_template, node_context, {})
+    for html in iter_rendered_forms(formset, helper, template_pack, form_template, node_context, render_layout):
+        yield html
+    yield render_chunk(end_template, node_context, {})
+
+
+class FormsetWindow(object):
+    """
+    Stands for the forms of `formset` from `start` to `stop`, only building those.
+    Bounds outside of the formset's forms are clamped to them.
+
+    Rendered from the first form, a window is a formset page of bounded size: its
+    management form counts the forms up to `stop`, so that the page can be posted::
+
+        formset = ItemFormSet(queryset=Item.objects.all())
+        html = ''.join(stream_formset(FormsetWindow(formset, stop=100), helper))
+
+    Further forms are rendered on demand using `render_formset_rows`, the page
+    then sets its `TOTAL_FORMS` and `INITIAL_FORMS` to the window's
+    `total_form_count()` and `initial_form_count()`. Model formsets still count
+    their initial forms by fetching their queryset, but forms outside of the window
+    are neither built nor rendered.
+    """
+    def __init__(self, formset, start=0, stop=None):
+        self.formset = formset
+        total_form_count = formset.total_form_count()
+        # Bounds are clamped to the formset's forms, they may come from a request
+        self.start = max(0, min(start, total_form_count))
+        self.stop = total_form_count if stop is None else max(self.start, min(stop, total_form_count))
+
+    def __getattr__(self, name):
+        return getattr(self.formset, name)
+
+    def __iter__(self):
+        return iter(self.forms)
+
+    def __len__(self):
+        return len(self.forms)
+
+    def __getitem__(self, index):
+        return self.forms[index]
+
+    @cached_property
+    def forms(self):
+        if 'forms' in self.formset.__dict__:
+            return self.formset.forms[self.start:self.stop]
+        return [
+            self.formset._construct_form(i, **self.formset.get_form_kwargs(i))
+            for i in range(self.start, self.stop)
+        ]
+
+    def total_form_count(self):
+        return self.stop
+
+    def is_multipart(self):
+        return (self.forms[0] if self.forms else self.formset.empty_form).is_multipart()
+
+    @property
+    def media(self):
+        return (self.forms[0] if self.forms else self.formset.empty_form).media
+
+    def initial_form_count(self):
+        return min(self.formset.initial_form_count(), self.stop)
+
+    @cached_property
+    def management_form(self):
+        return ManagementForm(auto_id=self.formset.auto_id, prefix=self.formset.prefix, initial={
+            TOTAL_FORM_COUNT: self.total_form_count(),
+            INITIAL_FORM_COUNT: self.initial_form_count(),
+            MIN_NUM_FORM_COUNT: self.formset.min_num,
+            MAX_NUM_FORM_COUNT: self.formset.max_num,
+        })
+
+
+def render_formset_rows(formset, start, stop, helper=None, context=None, template_pack=None):
+    """
+    Returns the HTML of the forms of `formset` from `start` to `stop`, the table rows
+    when using `table_inline_formset.html`, without the form tag, management form or
+    header. Meant to be returned by a view adding rows to a windowed formset.
+    """
+    window = FormsetWindow(formset, start, stop)
+    helper, template_pack, templates, node_context, render_layout = get_formset_rendering(
+        window, helper, context, template_pack
+    )
+    return mark_safe(''.join(
+        iter_rendered_forms(window, helper, template_pack, templates[1], node_context, render_layout)
+    ))
+
+
+def get_widgets(field):
+    # Same widgets `{% crispy_field %}` sets classes on
+    widget = field.field.widget
+    return getattr(widget, 'widgets', [getattr(widget, 'widget', widget)])
+
+
+class TableColumn(object):
+    """
+    Parts of a `table_inline_formset.html` column that are the same for every row:
+    the widget type checks, the class names `{% crispy_field %}` adds to the widgets
+    and the help text. The classes each widget already has are merged per row.
+    """
+    def __init__(self, field, converters):
+        self.name = field.name
+        self.is_hidden = field.is_hidden
+        self.required = field.field.required
+        widget = field.field.widget
+        # Choices are laid out by their own templates, those cells go through `field.html`
+        self.use_template = isinstance(widget, (forms.CheckboxSelectMultiple, forms.RadioSelect))
+        self.html5_required = self.required and not isinstance(widget, forms.RadioSelect)
+        self.help_text = field.help_text
+
+        self.converters = converters
+        self.class_names = {}
+        for widget in get_widgets(field):
+            self.get_class_name(widget)
+
+    def get_class_name(self, widget):
+        """
+        Returns the class name `{% crispy_field %}` adds to `widget`, looked up once
+        per widget class.
+        """
+        try:
+            return self.class_names[widget.__class__]
+        except KeyError:
+            class_name = widget.__class__.__name__.lower()
+            class_name = self.class_names[widget.__class__] = self.converters.get(class_name, class_name)
+            return class_name
+
+
+class TableRowRenderer(object):
+    """
+    Renders the header and the rows of `table_inline_formset.html`. What is the same
+    for every row, the header and the resolved `field.html`, is computed once per
+    formset, and each cell is rendered by `field.html`.
+
+    Setting `CRISPY_TABLE_CELLS_IN_PYTHON` builds the markup of cells in Python
+    instead, computing each column's widget classes, checks and help text once, and
+    leaving only the widgets, classes and errors of each cell to be rendered per row.
+    That markup mirrors the app's own `bootstrap/field.html`, so it's only used when
+    `field.html` resolves to it, not to an override or to crispy_forms' one.
+
+    Columns are those of the formset's first form, or of its empty form when it has
+    none. Forms whose fields don't match them, and fields laid out by `radioselect.html`
+    or `checkboxselectmultiple.html`, are always rendered by `field.html`.
+    """
+    def __init__(self, formset):
+        self.formset = formset
+        self.field_template = resolve_template('bootstrap/field.html', 'bootstrap')
+        self.cells_in_python = getattr(settings, 'CRISPY_TABLE_CELLS_IN_PYTHON', False) and (
+            os.path.abspath(self.field_template.origin.name) == FIELD_TEMPLATE_PATH
+        )
+
+    @cached_property
+    def columns(self):
+        # Built when a row is first rendered, the empty form is only built for formsets
+        # without forms whose empty form template isn't cached yet
+        converters = dict(CLASS_CONVERTERS, **getattr(settings, 'CRISPY_CLASS_CONVERTERS', {}))
+        form = self.formset.forms[0] if self.formset.forms else self.formset.empty_form
+        return [TableColumn(field, converters) for field in form]
+
+    @cached_property
+    def names(self):
+        return [column.name for column in self.columns]
+
+    @cached_property
+    def header(self):
+        if not self.formset.forms:
+            return ''
+        return mark_safe(''.join(self.render_header_cell(field) for field in self.formset.forms[0]))
+
+    def render_header_cell(self, field):
+        if not field.label or field.is_hidden:
+            return ''
+        required = field.field.required and not isinstance(field.field.widget, forms.CheckboxInput)
+        return '<th for="%s" class="control-label %s">%s%s</th>' % (
+            conditional_escape(field.auto_id),
+            'requiredField' if required else '',
+            field.label,
+            '<span class="asteriskField">*</span>' if required else '',
+        )
+
+    def render_header(self):
+        return self.header
+
+    def render_row(self, form, context):
+        """
+        Renders the cells of `form`'s row.
+        """
+        fields = list(form)
+        if not self.cells_in_python or [field.name for field in fields] != self.names:
+            return mark_safe(''.join(self.render_field(field, context) for field in fields))
+
+        options = self.get_options(context)
+        return mark_safe(''.join(
+            self.render_cell(column, field, options, context) for column, field in zip(self.columns, fields)
+        ))
+
+    def get_options(self, context):
+        """
+        Returns the helper options cells depend on.
+        """
+        return (
+            context.get('form_show_errors'),
+            context.get('help_text_inline'),
+            context.get('error_text_inline'),
+            context.get('html5_required'),
+            context.get('wrapper_class'),
+        )
+
+    def render_field(self, field, context):
+        with context.push(field=field, tag='td', form_show_labels=False):
+            return self.field_template.template.render(context)
+
+    def render_cell(self, column, field, options, context):
+        if column.is_hidden:
+            return str(field)
+        if column.use_template:
+            return self.render_field(field, context)
+
+        form_show_errors, help_text_inline, error_text_inline, html5_required, wrapper_class = options
+        for widget in get_widgets(field):
+            # Merged with the widget's own classes, as `{% crispy_field %}` does
+            class_name = column.get_class_name(widget)
+            css_class = widget.attrs.get('class', '')
+            if css_class:
+                if css_class.find(class_name) == -1:
+                    css_class += " %s" % class_name
+            else:
+                css_class = class_name
+            widget.attrs['class'] = css_class
+            if html5_required and column.html5_required and 'required' not in widget.attrs:
+                widget.attrs['required'] = 'required'
+
+        auto_id = conditional_escape(field.auto_id)
+        errors = field.errors if form_show_errors else ()
+        css_classes = field.css_classes()
+
+        html = [
+            '<td id="div_%s" class="control-group%s%s%s"><div class="controls">' % (
+                auto_id,
+                ' %s' % conditional_escape(wrapper_class) if wrapper_class else '',
+                ' error' if errors else '',
+                ' %s' % conditional_escape(css_classes) if css_classes else '',
+            ),
+            str(field),
+        ]
+
+        help_text = ''
+        if column.help_text:
+            help_text = '<%s id="hint_%s" class="%s">%s</%s>' % (
+                ('span', auto_id, 'help-inline', column.help_text, 'span') if help_text_inline else
+                ('p', auto_id, 'help-block', column.help_text, 'p')
+            )
+        if help_text_inline and not error_text_inline:
+            html.append(help_text)
+        error_tag = 'span' if error_text_inline else 'p'
+        error_class = 'help-inline' if error_text_inline else 'help-block'
+        for counter, error in enumerate(errors, 1):
+            html.append('<%s id="error_%s_%s" class="%s"><strong>%s</strong></%s>' % (
+                error_tag, counter, auto_id, error_class, conditional_escape(error), error_tag
+            ))
+        if not help_text_inline:
+            html.append(help_text)
+
+        html.append('</div></td>')
+        return ''.join(html)
+
+
+def get_table_renderer(formset):
+    """
+    Returns the `TableRowRenderer` of `formset`, built the first time it's needed.
+    """
+    renderer = formset.__dict__.get('_table_renderer')
+    if renderer is None:
+        renderer = formset.__dict__['_table_renderer'] = TableRowRenderer(formset)
+    return renderer
+
+
+def get_class_key(cls):
+    # Factories build a new class per call, those are told apart by their bases
+    return cls.__bases__ if cls.__module__ in FACTORY_MODULES else cls
+
+
+def get_empty_form_key(formset, options):
+    """
+    Returns the key of the empty form template of `formset`: its form, the factory
+    options the empty form depends on, its prefix, the active language and the helper
+    `options`. Classes built by the formset factories are keyed by their bases, the
+    model and the form's field names, so that formsets built per request share it.
+    """
+    formset = getattr(formset, 'formset', formset)
+    form_class = formset.form
+    return (
+        get_class_key(formset.__class__), get_class_key(form_class), getattr(formset, 'model', None),
+        tuple(form_class.base_fields), formset.extra, formset.can_delete, formset.can_order,
+        formset.prefix, get_language(), options,
+    )
+
+
+def render_empty_form(formset, context):
+    """
+    Renders the empty form row of `table_inline_formset.html`, according to the
+    helper's `formset_empty_form`:
+
+    * `'row'`, the default, renders a hidden `<tr class="empty-form">`.
+    * `'template'` renders the row inside an inert `<template class="empty-form">`.
+      It's rendered once per key returned by `get_empty_form_key`, sparing building
+      the empty form on later renders, and the `EMPTY_FORM_CACHE_SIZE` most recently
+      used are kept. Formsets without forms still build it for the form tag, as
+      `formset.is_multipart()` does. Formsets whose empty form depends on more than that, like
+      forms changing their fields in `__init__`, should not use it.
+    * `None` or `False` leaves it out.
+    """
+    mode = context.get('formset_empty_form', EMPTY_FORM_ROW)
+    if not mode:
+        return ''
+
+    renderer = get_table_renderer(formset)
+    if mode != EMPTY_FORM_TEMPLATE:
+        return mark_safe('<tr class="hidden empty-form">%s</tr>' % renderer.render_row(formset.empty_form, context))
+
+    key = get_empty_form_key(formset, renderer.get_options(context))
+    with _empty_form_templates_lock:
+        html = _empty_form_templates.get(key)
+        if html is not None:
+            _empty_form_templates.move_to_end(key)
+            return html
+
+    html = mark_safe(
+        '<template class="empty-form"><tr>%s</tr></template>' % renderer.render_row(formset.empty_form, context)
+    )
+    with _empty_form_templates_lock:
+        _empty_form_templates[key] = html
+        while len(_empty_form_templates) > EMPTY_FORM_CACHE_SIZE:
+            _empty_form_templates.popitem(last=False)
+    return html
+
+
+@receiver(setting_changed)
+def _reset_empty_form_templates(**kwargs):
+    if kwargs['setting'] in ('CRISPY_CLASS_CONVERTERS', 'CRISPY_TABLE_CELLS_IN_PYTHON', 'TEMPLATES'):
+        _empty_form_templates.clear()
@@ -1,15 +1,89 @@
-from django.template import Template
-from django.template.loader import render_to_string
+import asyncio
+from collections import namedtuple
+from copy import copy
+from operator import itemgetter
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import connections
+from django.utils import timezone, translation
 from django.utils.html import conditional_escape
 
+from crispy_forms.exceptions import DynamicError
 from crispy_forms.utils import (
-    TEMPLATE_PACK, flatatt, get_template_pack, render_field,
+    TEMPLATE_PACK, flatatt, render_field,
+)
+
+from .profiling import get_profiler, profile_layout
+from .utils import (
+    FrozenDict, TemplateString, get_render_executor, get_template_pack, is_static_layout_object, render_in_context,
+    resolve_template,
 )
 
 TEMPLATE_PACK = getattr(settings,
                         'CRISPY_TEMPLATE_PACK',
                         'bootstrap')
 
+# Default CSS classes of buttons and rows, per template pack. Packs not listed
+# get the bootstrap ones
+CSS_CLASSES = {
+    'bootstrap': {'submit': 'btn btn-primary', 'button': 'btn', 'reset': 'btn btn-inverse', 'row': 'row'},
+    'bootstrap4': {'submit': 'btn btn-primary', 'button': 'btn', 'reset': 'btn btn-inverse', 'row': 'form-row'},
+    'uni_form': {'submit': 'submit submitButton', 'button': 'button', 'reset': 'reset resetButton', 'row': 'formRow'},
+}
+
+# Kinds of steps in a layout render plan, see `LayoutObject.compile`
+PLAN_FIELD = 'field'
+PLAN_HTML = 'html'
+PLAN_LAYOUT_OBJECT = 'layout_object'
+
+# Fields a top level subtree of a `Layout` must hold to be rendered on a thread when
+# rendering in parallel, unless set by `CRISPY_PARALLEL_RENDER_MIN_FIELDS`
+PARALLEL_RENDER_MIN_FIELDS = 40
+
+# `list` methods proxied by `LayoutObject.__getattr__` that change the layout
+FIELDS_MUTATING_METHODS = ('append', 'clear', 'extend', 'insert', 'pop', 'remove', 'reverse', 'sort')
+
+# Index of a layout used by `LayoutObject.get_layout_objects`, see `LayoutObject.get_layout_index`
+LayoutIndex = namedtuple('LayoutIndex', ['containers', 'objects', 'fields'])
+
+
+def get_css_classes():
+    # Constructors of buttons and rows only look the table up, the template pack is
+    # read from the settings once
+    return CSS_CLASSES.get(get_template_pack(), CSS_CLASSES['bootstrap'])
+
+
+def flatten_layout_classes(LayoutClasses):
+    # `FormHelper.filter` passes the classes as a tuple, `get_layout_objects(str)` doesn't
+    flat = ()
+    for LayoutClass in LayoutClasses:
+        if isinstance(LayoutClass, tuple):
+            flat += flatten_layout_classes(LayoutClass)
+        else:
+            flat += (LayoutClass,)
+    return flat
+
+
+def snapshot_fields(fields):
+    # Frozen layout objects hold a tuple, which can't change
+    return fields if isinstance(fields, tuple) else list(fields)
+
+
+def walk_layout(layout_object, index, max_level, greedy):
+    """
+    Yields `(pointer, layout_object)` for every layout object or field name held by
+    `layout_object`, depth first, going as deep as `max_level` or `greedy` allow.
+    """
+    for i, nested_object in enumerate(layout_object.fields):
+        pointer = index + [i]
+        yield pointer, nested_object
+
+        # If it's a layout object and we haven't reached the max depth limit or greedy
+        # we go through it
+        if hasattr(nested_object, 'get_field_names') and (len(index) < max_level or greedy):
+            for nested_pointer in walk_layout(nested_object, pointer, max_level, greedy):
+                yield nested_pointer
 
 
 class TemplateNameMixin(object):
@@ -22,20 +96,190 @@ class TemplateNameMixin(object):
 
         return template
 
+    def get_template(self, template_pack):
+        """
+        Returns the resolved template object for `template_pack`. It's looked up
+        once per template name and pack, so rendering it is just `template.render()`.
+        """
+        return resolve_template(self.template, template_pack)
+
+
+class FreezableMixin(object):
+    """
+    Layout objects can be frozen with `freeze()` once built, making them read-only, so
+    that a layout defined at module level can be shared across threads without copying
+    it. Rendering never changes a layout object, frozen or not.
+    """
+
+    def __setattr__(self, name, value):
+        self.check_not_frozen()
+        super(FreezableMixin, self).__setattr__(name, value)
+
+    def check_not_frozen(self):
+        if self.__dict__.get('_frozen', False):
+            raise DynamicError("%s is frozen, it can't be changed" % self.__class__.__name__)
+
+    def freeze(self):
+        """
+        Makes this layout object and the ones it holds read-only. Their fields become
+        a tuple and their `attrs` a `FrozenDict`. Returns the layout object itself.
+        """
+        if 'fields' in self.__dict__:
+            for layout_object in self.fields:
+                if hasattr(layout_object, 'freeze'):
+                    layout_object.freeze()
+            self.fields = tuple(self.fields)
+
+        if isinstance(self.__dict__.get('attrs'), dict):
+            self.attrs = FrozenDict(self.attrs)
+
+        self._frozen = True
+        return self
+
+
+def render_step(kind, value, form, form_style, context, template_pack, kwargs):
+    # One step of a render plan, see `LayoutObject.compile`
+    if kind != PLAN_FIELD:
+        profiler = get_profiler()
+        if profiler is not None:
+            return profiler.profile(
+                value, form, template_pack, render_step_unprofiled,
+                kind, value, form, form_style, context, template_pack, kwargs
+            )
+    return render_step_unprofiled(kind, value, form, form_style, context, template_pack, kwargs)
+
+
+def render_step_unprofiled(kind, value, form, form_style, context, template_pack, kwargs):
+    if kind == PLAN_HTML:
+        return value._html.render(context)
+    return render_field(value, form, form_style, context, template_pack=template_pack, **kwargs)
+
+
+def render_subtree(layout_object, form, form_style, context, template_pack, language, current_timezone):
+    # Runs on a worker thread, where the active language and time zone of the
+    # rendering thread have to be set again. `form` and `context` are the thread's own
+    try:
+        with translation.override(language), timezone.override(current_timezone):
+            return render_field(layout_object, form, form_style, context, template_pack=template_pack)
+    finally:
+        # Connections are per thread, the pool's threads outlive the request
+        connections.close_all()
+
+
+def copy_form(form):
+    """
+    Returns a shallow copy of `form` for a worker thread, with its own bound fields and
+    rendered fields. Errors have to be computed first, they're shared.
+    """
+    worker_form = copy(form)
+    worker_form._bound_fields_cache = {}
+    worker_form.rendered_fields = set()
+    return worker_form
+
+
+def copy_context(context):
+    """
+    Returns a copy of `context` for a worker thread, whose layers, and those of its
+    render context, are copies as well, so that neither thread sees the other's changes.
+    """
+    worker_context = copy(context)
+    worker_context.dicts = [dict(layer) for layer in context.dicts]
+    render_context = getattr(worker_context, 'render_context', None)
+    if render_context is not None:
+        render_context.dicts = [dict(layer) for layer in render_context.dicts]
+    return worker_context
+
+
+def get_subtree_field_names(layout_object):
+    if hasattr(layout_object, 'get_layout_index'):
+        return list(layout_object.get_layout_index().fields)
+    if hasattr(layout_object, 'get_field_names'):
+        return [name for pointer, name in layout_object.get_field_names()]
+    return []
+
+
+def can_render_on_thread(layout_object, form):
+    """
+    Returns whether `layout_object` can be rendered on a worker thread. Strings rendered
+    against the context may resolve lazy values, like `request.user`, and model choice
+    fields read their choices, both from the database. Worker threads have their own
+    connections, which don't see uncommitted rows or in-memory test databases.
+    """
+    if not is_static_layout_object(layout_object):
+        return False
+    fields = getattr(form, 'fields', {})
+    return not any(hasattr(fields.get(name), 'queryset') for name in get_subtree_field_names(layout_object))
+
+
+def count_fields(layout_object):
+    """
+    Returns the number of fields rendered by `layout_object`, at any depth.
+    """
+    if hasattr(layout_object, 'get_layout_index'):
+        return sum(len(pointers) for pointers in layout_object.get_layout_index().fields.values())
+    if hasattr(layout_object, 'get_field_names'):
+        return len(layout_object.get_field_names())
+    return 0
+
+
+def run_sync(func, *args, **kwargs):
+    """
+    Returns an awaitable running `func` on the thread synchronous code runs on. Fields
+    and templates may query the database, which Django forbids on the event loop.
+    """
+    return sync_to_async(func, thread_sensitive=True)(*args, **kwargs)
+
+
+async def arender_step(kind, value, form, form_style, context, template_pack, concurrent, kwargs):
+    # Async counterpart of `render_step`, layout objects are rendered as `render_field` does
+    if kind == PLAN_LAYOUT_OBJECT and hasattr(value, 'arender'):
+        return await value.arender(form, form_style, context, template_pack=template_pack, concurrent=concurrent)
+    return await run_sync(render_step, kind, value, form, form_style, context, template_pack, kwargs)
+
+
+class RenderedLayoutObject(object):
+    """
+    The values of one render of a layout object, like a `BaseInput` rendered value or
+    a `MultiField` css class. Attributes set on it shadow the layout object's, which
+    is never changed while rendering. It's what templates get as the layout object.
+    """
+    def __init__(self, layout_object, **values):
+        self.__dict__.update(values)
+        self.layout_object = layout_object
+
+    def __getattr__(self, name):
+        return getattr(self.layout_object, name)
+
+
+class LayoutObject(TemplateNameMixin, FreezableMixin):
+    # Whether `render` renders the layout objects held through `get_rendered_fields`
+    # as they are, so that `arender` can await them first
+    awaits_fields = False
 
-class LayoutObject(TemplateNameMixin):
     def __getitem__(self, slice):
         return self.fields[slice]
 
     def __setitem__(self, slice, value):
+        self.check_not_frozen()
         self.fields[slice] = value
+        self.invalidate()
 
     def __delitem__(self, slice):
+        self.check_not_frozen()
         del self.fields[slice]
+        self.invalidate()
 
     def __len__(self):
         return len(self.fields)
 
+    def __getstate__(self):
+        # Render plans and the layout index are rebuilt on demand, they are left out
+        # of copies and pickles
+        state = self.__dict__.copy()
+        state.pop('_render_plans', None)
+        state.pop('_layout_index', None)
+        return state
+
     def __getattr__(self, name):
         """
         This allows us to access self.fields list methods like append or insert, without
@@ -43,10 +287,93 @@ class LayoutObject(TemplateNameMixin):
         """
         # Check necessary for unpickling, see #107
         if 'fields' in self.__dict__ and hasattr(self.fields, name):
-            return getattr(self.fields, name)
+            attribute = getattr(self.fields, name)
+            if name in FIELDS_MUTATING_METHODS:
+                def mutate(*args, **kwargs):
+                    result = attribute(*args, **kwargs)
+                    self.invalidate()
+                    return result
+                return mutate
+            return attribute
         else:
+            # Frozen layout objects hold a tuple, which lacks `list` mutating methods
+            if 'fields' in self.__dict__ and name in FIELDS_MUTATING_METHODS:
+                self.check_not_frozen()
             return object.__getattribute__(self, name)
 
+    def compile(self, template_pack=TEMPLATE_PACK):
+        """
+        Returns the render plan of this layout object for `template_pack`: a tuple of
+        `(kind, value)` steps, one per layout object or field name held, that
+        `get_rendered_fields` follows instead of dispatching every entry through
+        `render_field`. Nested layout objects are compiled as well.
+
+        Plans are cached on the layout object and reused across renders, they are
+        invalidated when it's mutated through `__setitem__`, `__delitem__` or the
+        proxied `list` methods.
+        """
+        render_plans = self.__dict__.setdefault('_render_plans', {})
+        try:
+            fields, plan = render_plans[template_pack]
+        except KeyError:
+            pass
+        else:
+            # `fields` can still be edited directly, as `LayoutSlice` does
+            if fields == self.fields:
+                return plan
+
+        plan = []
+        for field in self.fields:
+            if field is None:
+                continue
+            elif isinstance(field, HTML) and type(field).render is HTML.render:
+                # Subclasses overriding `render` are rendered as any layout object
+                plan.append((PLAN_HTML, field))
+            elif hasattr(field, 'render'):
+                if hasattr(field, 'compile'):
+                    field.compile(template_pack)
+                plan.append((PLAN_LAYOUT_OBJECT, field))
+            else:
+                plan.append((PLAN_FIELD, field))
+
+        plan = tuple(plan)
+        render_plans[template_pack] = (snapshot_fields(self.fields), plan)
+        return plan
+
+    def invalidate(self):
+        """
+        Drops the cached render plans and layout index of this layout object.
+        """
+        self.__dict__.pop('_render_plans', None)
+        self.__dict__.pop('_layout_index', None)
+
+    def get_layout_index(self):
+        """
+        Returns a `LayoutIndex` of everything held by this layout object, at any depth:
+        `objects` maps every class to the `(pointer, layout_object)` of its instances
+        and `fields` maps every field name to its pointers.
+
+        The index is built once and reused while neither this layout object nor the ones
+        it holds are changed. As `LayoutSlice` edits `fields` directly, that is checked
+        against a snapshot of every container's fields.
+        """
+        layout_index = self.__dict__.get('_layout_index')
+        if layout_index is not None and all(
+            fields == container.fields for container, fields in layout_index.containers
+        ):
+            return layout_index
+
+        layout_index = LayoutIndex([(self, snapshot_fields(self.fields))], {}, {})
+        for pointer, layout_object in walk_layout(self, [], 0, True):
+            layout_index.objects.setdefault(layout_object.__class__, []).append((pointer, layout_object))
+            if isinstance(layout_object, str):
+                layout_index.fields.setdefault(layout_object, []).append(pointer)
+            if hasattr(layout_object, 'get_field_names'):
+                layout_index.containers.append((layout_object, snapshot_fields(layout_object.fields)))
+
+        self.__dict__['_layout_index'] = layout_index
+        return layout_index
+
     def get_field_names(self, index=None):
         """
         Returns a list of lists, those lists are named pointers. First parameter
@@ -78,34 +405,102 @@ class LayoutObject(TemplateNameMixin):
         max_level = kwargs.pop('max_level', 0)
         greedy = kwargs.pop('greedy', False)
 
-        pointers = []
+        if index is not None and not isinstance(index, list):
+            index = [index]
+        elif index is None:
+            index = []
+
+        LayoutClasses = flatten_layout_classes(LayoutClasses)
+        matches = []
+        for LayoutClass, layout_objects in self.get_layout_index().objects.items():
+            if issubclass(LayoutClass, LayoutClasses):
+                matches.extend(layout_objects)
+        # Layout objects of different classes are put back in traversal order
+        matches.sort(key=itemgetter(0))
+
+        # Nested layout objects are only reached while the depth of their container
+        # is below `max_level`
+        max_length = max(max_level - len(index), 0) + 1
+        if LayoutClasses == (str,):
+            return [
+                [index + pointer, layout_object] for pointer, layout_object in matches
+                if greedy or len(pointer) <= max_length
+            ]
+        return [
+            [index + pointer, layout_object.__class__.__name__.lower()] for pointer, layout_object in matches
+            if greedy or len(pointer) <= max_length
+        ]
+
+    def iter_layout_objects(self, *LayoutClasses, **kwargs):
+        """
+        Generator version of `get_layout_objects`, it yields the pointers while going
+        through the layout instead of building intermediate lists.
+        """
+        index = kwargs.pop('index', None)
+        max_level = kwargs.pop('max_level', 0)
+        greedy = kwargs.pop('greedy', False)
 
         if index is not None and not isinstance(index, list):
             index = [index]
         elif index is None:
             index = []
 
-        for i, layout_object in enumerate(self.fields):
+        LayoutClasses = flatten_layout_classes(LayoutClasses)
+        for pointer, layout_object in walk_layout(self, index, max_level, greedy):
             if isinstance(layout_object, LayoutClasses):
-                if len(LayoutClasses) == 1 and LayoutClasses[0] == str:
-                    pointers.append([index + [i], layout_object])
+                if LayoutClasses == (str,):
+                    yield [pointer, layout_object]
                 else:
-                    pointers.append([index + [i], layout_object.__class__.__name__.lower()])
-
-            # If it's a layout object and we haven't reached the max depth limit or greedy
-            # we recursive call
-            if hasattr(layout_object, 'get_field_names') and (len(index) < max_level or greedy):
-                new_kwargs = {'index': index + [i], 'max_level': max_level, 'greedy': greedy}
-                pointers = pointers + layout_object.get_layout_objects(*LayoutClasses, **new_kwargs)
+                    yield [pointer, layout_object.__class__.__name__.lower()]
 
-        return pointers
+    def get_rendered_fields(self, form, form_style, context, template_pack=TEMPLATE_PACK, rendered_fields=None,
+                            **kwargs):
+        # Fields already awaited by `arender`
+        if rendered_fields is not None:
+            return rendered_fields
 
-    def get_rendered_fields(self, form, form_style, context, template_pack=TEMPLATE_PACK, **kwargs):
         return ''.join(
-            render_field(field, form, form_style, context, template_pack=template_pack, **kwargs)
-            for field in self.fields
+            render_step(kind, value, form, form_style, context, template_pack, kwargs)
+            for kind, value in self.compile(template_pack)
         )
 
+    async def arender(self, form, form_style, context, template_pack=TEMPLATE_PACK, concurrent=False, **kwargs):
+        """
+        Async counterpart of `render`, with the same output. Layout objects rendering
+        what they hold as it is, `Layout`, `Div`, `Fieldset` and `ButtonHolder`, await
+        it through `aget_rendered_fields`, others are rendered with `run_sync`, as are
+        fields and templates. Only layout objects overriding `arender` with truly
+        asynchronous work gain from `concurrent`.
+        """
+        if not self.awaits_fields:
+            return await run_sync(self.render, form, form_style, context, template_pack, **kwargs)
+
+        fields = await self.aget_rendered_fields(
+            form, form_style, context, template_pack, concurrent=concurrent, **kwargs
+        )
+        return await run_sync(self.render, form, form_style, context, template_pack, rendered_fields=fields, **kwargs)
+
+    async def aget_rendered_fields(self, form, form_style, context, template_pack=TEMPLATE_PACK,
+                                   concurrent=False, **kwargs):
+        """
+        Async counterpart of `get_rendered_fields`, awaiting the `arender` of the layout
+        objects held. With `concurrent`, they are awaited together, each against its
+        own copy of `context`, so that the ones waiting on I/O don't hold the others.
+        """
+        plan = self.compile(template_pack)
+        if concurrent:
+            rendered = await asyncio.gather(*[
+                arender_step(kind, value, form, form_style, copy(context), template_pack, concurrent, kwargs)
+                for kind, value in plan
+            ])
+        else:
+            rendered = []
+            for kind, value in plan:
+                rendered.append(
+                    await arender_step(kind, value, form, form_style, context, template_pack, concurrent, kwargs)
+                )
+        return ''.join(rendered)
+
 
 class Layout(LayoutObject):
     """
@@ -135,12 +530,69 @@ class Layout(LayoutObject):
             ),
         )
     """
+    awaits_fields = True
+
     def __init__(self, *fields):
         self.fields = list(fields)
 
     def render(self, form, form_style, context, template_pack=TEMPLATE_PACK, **kwargs):
+        return profile_layout(
+            self, form, template_pack, self.render_unprofiled, form, form_style, context, template_pack, **kwargs
+        )
+
+    def render_unprofiled(self, form, form_style, context, template_pack=TEMPLATE_PACK, **kwargs):
+        if context.get('parallel_render') and 'rendered_fields' not in kwargs:
+            return self.render_in_parallel(form, form_style, context, template_pack, **kwargs)
         return self.get_rendered_fields(form, form_style, context, template_pack, **kwargs)
 
+    def render_in_parallel(self, form, form_style, context, template_pack=TEMPLATE_PACK, **kwargs):
+        """
+        Renders the layout, rendering its top level layout objects holding at least
+        `CRISPY_PARALLEL_RENDER_MIN_FIELDS` fields on the thread pool returned by
+        `get_render_executor`. The rest is rendered meanwhile on the current thread,
+        everything is joined in order.
+
+        Each worker gets its own copy of the form and of `context`. Form errors are
+        computed beforehand, and the fields rendered on the workers are added to
+        `form.rendered_fields` once they are done. Subtrees `can_render_on_thread`
+        rejects, as they may query the database, stay on the current thread.
+
+        It's used by `render` when the helper has `parallel_render` set. Unless two
+        subtrees are big enough, the layout is rendered on the current thread, as
+        it is while being profiled.
+        """
+        min_fields = getattr(settings, 'CRISPY_PARALLEL_RENDER_MIN_FIELDS', PARALLEL_RENDER_MIN_FIELDS)
+        plan = self.compile(template_pack)
+        parallel = [
+            kind == PLAN_LAYOUT_OBJECT and count_fields(value) >= min_fields and can_render_on_thread(value, form)
+            for kind, value in plan
+        ]
+        if sum(parallel) < 2 or get_profiler() is not None:
+            return self.get_rendered_fields(form, form_style, context, template_pack, **kwargs)
+
+        # Cleaning may query the database, and must only run once
+        form.errors
+        executor = get_render_executor()
+        language = translation.get_language()
+        current_timezone = timezone.get_current_timezone()
+        rendered = []
+        worker_forms = []
+        for (kind, value), in_parallel in zip(plan, parallel):
+            if in_parallel:
+                worker_forms.append(copy_form(form))
+                rendered.append(executor.submit(
+                    render_subtree, value, worker_forms[-1], form_style, copy_context(context), template_pack,
+                    language, current_timezone,
+                ))
+            else:
+                rendered.append(render_step(kind, value, form, form_style, context, template_pack, kwargs))
+
+        html = ''.join(html if isinstance(html, str) else html.result() for html in rendered)
+        if hasattr(form, 'rendered_fields'):
+            for worker_form in worker_forms:
+                form.rendered_fields.update(worker_form.rendered_fields)
+        return html
+
 
 class ButtonHolder(LayoutObject):
     """
@@ -157,6 +609,7 @@ class ButtonHolder(LayoutObject):
         )
     """
     template = "%s/layout/buttonholder.html"
+    awaits_fields = True
 
     def __init__(self, *fields, **kwargs):
         self.fields = list(fields)
@@ -167,13 +620,11 @@ class ButtonHolder(LayoutObject):
     def render(self, form, form_style, context, template_pack=TEMPLATE_PACK, **kwargs):
         html = self.get_rendered_fields(form, form_style, context, template_pack, **kwargs)
 
-        template = self.get_template_name(template_pack)
-        context.update({'buttonholder': self, 'fields_output': html})
-
-        return render_to_string(template, context.flatten())
+        template = self.get_template(template_pack)
+        return render_in_context(template, context, {'buttonholder': self, 'fields_output': html})
 
 
-class BaseInput(TemplateNameMixin):
+class BaseInput(TemplateNameMixin, FreezableMixin):
     """
     A base class to reduce the amount of code in the Input classes.
     """
@@ -191,16 +642,25 @@ class BaseInput(TemplateNameMixin):
         self.template = kwargs.pop('template', self.template)
         self.flat_attrs = flatatt(kwargs)
 
+    @property
+    def value(self):
+        return self._value.source
+
+    @value.setter
+    def value(self, value):
+        self._value = TemplateString(value)
+
     def render(self, form, form_style, context, template_pack=TEMPLATE_PACK, **kwargs):
         """
         Renders an `<input />` if container is used as a Layout object.
         Input button value can be a variable in context.
         """
-        self.value = Template(str(self.value)).render(context)
-        template = self.get_template_name(template_pack)
-        context.update({'input': self})
+        rendered_input = RenderedLayoutObject(self, value=self._value.render(context))
+        template = self.get_template(template_pack)
+        return render_in_context(template, context, {'input': rendered_input})
 
-        return render_to_string(template, context.flatten())
+    async def arender(self, form, form_style, context, template_pack=TEMPLATE_PACK, **kwargs):
+        return await run_sync(self.render, form, form_style, context, template_pack, **kwargs)
 
 
 class Submit(BaseInput):
@@ -214,7 +674,7 @@ class Submit(BaseInput):
     input_type = 'submit'
 
     def __init__(self, *args, **kwargs):
-        self.field_classes = 'submit submitButton' if get_template_pack() == 'uni_form' else 'btn btn-primary'
+        self.field_classes = get_css_classes()['submit']
         super(Submit, self).__init__(*args, **kwargs)
 
 
@@ -229,7 +689,7 @@ class Button(BaseInput):
     input_type = 'button'
 
     def __init__(self, *args, **kwargs):
-        self.field_classes = 'button' if get_template_pack() == 'uni_form' else 'btn'
+        self.field_classes = get_css_classes()['button']
         super(Button, self).__init__(*args, **kwargs)
 
 
@@ -252,7 +712,7 @@ class Reset(BaseInput):
     input_type = 'reset'
 
     def __init__(self, *args, **kwargs):
-        self.field_classes = 'reset resetButton' if get_template_pack() == 'uni_form' else 'btn btn-inverse'
+        self.field_classes = get_css_classes()['reset']
         super(Reset, self).__init__(*args, **kwargs)
 
 
@@ -276,6 +736,7 @@ class Fieldset(LayoutObject):
         )
     """
     template = "%s/layout/fieldset.html"
+    awaits_fields = True
 
     def __init__(self, legend, *fields, **kwargs):
         self.fields = list(fields)
@@ -285,16 +746,23 @@ class Fieldset(LayoutObject):
         self.template = kwargs.pop('template', self.template)
         self.flat_attrs = flatatt(kwargs)
 
+    @property
+    def legend(self):
+        return self._legend.source
+
+    @legend.setter
+    def legend(self, legend):
+        self._legend = TemplateString(legend)
+
     def render(self, form, form_style, context, template_pack=TEMPLATE_PACK, **kwargs):
         fields = self.get_rendered_fields(form, form_style, context, template_pack, **kwargs)
 
         legend = ''
         if self.legend:
-            legend = '%s' % Template(str(self.legend)).render(context)
+            legend = '%s' % self._legend.render(context)
 
-        template = self.get_template_name(template_pack)
-        return render_to_string(
-            template,
+        template = self.get_template(template_pack)
+        return template.render(
             {'fieldset': self, 'legend': legend, 'fields': fields, 'form_style': form_style}
         )
 
@@ -316,26 +784,24 @@ class MultiField(LayoutObject):
         self.flat_attrs = flatatt(kwargs)
 
     def render(self, form, form_style, context, template_pack=TEMPLATE_PACK, **kwargs):
+        multifield = RenderedLayoutObject(self, bound_fields=[])
+
         # If a field within MultiField contains errors
-        if context['form_show_errors']:
-            for field in map(lambda pointer: pointer[1], self.get_field_names()):
-                if field in form.errors:
-                    self.css_class += " error"
+        if context['form_show_errors'] and not form.errors.keys().isdisjoint(self.get_layout_index().fields):
+            multifield.css_class = '%s error' % self.css_class
 
         field_template = self.field_template % template_pack
         fields_output = self.get_rendered_fields(
             form, form_style, context, template_pack, template=field_template,
-            labelclass=self.label_class, layout_object=self, **kwargs
+            labelclass=self.label_class, layout_object=multifield, **kwargs
         )
 
-        template = self.get_template_name(template_pack)
-        context.update({
-            'multifield': self,
+        template = self.get_template(template_pack)
+        return render_in_context(template, context, {
+            'multifield': multifield,
             'fields_output': fields_output
         })
 
-        return render_to_string(template, context.flatten())
-
 
 class Div(LayoutObject):
     """
@@ -346,6 +812,7 @@ class Div(LayoutObject):
         Div('form_field_1', 'form_field_2', css_id='div-example', css_class='divs')
     """
     template = "%s/layout/div.html"
+    awaits_fields = True
 
     def __init__(self, *fields, **kwargs):
         self.fields = list(fields)
@@ -362,8 +829,8 @@ class Div(LayoutObject):
     def render(self, form, form_style, context, template_pack=TEMPLATE_PACK, **kwargs):
         fields = self.get_rendered_fields(form, form_style, context, template_pack, **kwargs)
 
-        template = self.get_template_name(template_pack)
-        return render_to_string(template, {'div': self, 'fields': fields})
+        template = self.get_template(template_pack)
+        return template.render({'div': self, 'fields': fields})
 
 
 class Row(Div):
@@ -374,16 +841,7 @@ class Row(Div):
     """
 
     def __init__(self, *args, **kwargs):
-        # Map template packs to the css class they need here.
-        # TODO: This is a _Smell_. There should be a factory which creates a
-        #       template pack specific subclass. (Or such...)
-        row_class_map = {
-            'uni_form': 'formRow',
-            'bootstrap4': 'form-row',
-            'bootstrap3': 'row',
-        }
-        # Fetch the class, with a suitable default.
-        self.css_class = row_class_map.get(get_template_pack(), 'row')
+        self.css_class = get_css_classes()['row']
         super(Row, self).__init__(*args, **kwargs)
 
 
@@ -396,7 +854,7 @@ class Column(Div):
     css_class = 'formColumn'
 
 
-class HTML(object):
+class HTML(FreezableMixin):
     """
     Layout object. It can contain pure HTML and it has access to the whole
     context of the page where the form is being rendered.
@@ -410,8 +868,19 @@ class HTML(object):
     def __init__(self, html):
         self.html = html
 
+    @property
+    def html(self):
+        return self._html.source
+
+    @html.setter
+    def html(self, html):
+        self._html = TemplateString(html)
+
     def render(self, form, form_style, context, template_pack=TEMPLATE_PACK, **kwargs):
-        return Template(str(self.html)).render(context)
+        return self._html.render(context)
+
+    async def arender(self, form, form_style, context, template_pack=TEMPLATE_PACK, **kwargs):
+        return await run_sync(self.render, form, form_style, context, template_pack, **kwargs)
 
 
 class Field(LayoutObject):
@@ -0,0 +1,79 @@
+import re
+
+from django.conf import settings
+from django.template import Origin, TemplateDoesNotExist
+from django.template.loaders.base import Loader as BaseLoader
+
+FLAT_TEMPLATES = ('bootstrap/field.html',)
+
+# Only plain includes of a literal template name can be inlined, includes using
+# `with`, `only` or a variable are left as they are
+INCLUDE_RE = re.compile(r"""{%\s*include\s+(?P<quote>['"])(?P<template_name>[^'"]+)(?P=quote)\s*%}""")
+
+
+class Loader(BaseLoader):
+    """
+    Wraps a list of template loaders, like Django's cached loader does, and serves
+    the templates listed in the `CRISPY_FLAT_TEMPLATES` setting, by default
+    `bootstrap/field.html`, with their `{% include %}`s inlined. A field is then
+    rendered with a single template instead of up to four nested includes, each a
+    template lookup and a context push, while the partials stay the source of truth.
+
+    It should be wrapped by the cached loader, so templates are only flattened once::
+
+        'loaders': [
+            ('django.template.loaders.cached.Loader', [
+                ('crispy-forms-bootstrap2.loaders.Loader', [
+                    'django.template.loaders.filesystem.Loader',
+                    'django.template.loaders.app_directories.Loader',
+                ]),
+            ]),
+        ]
+    """
+
+    def __init__(self, engine, loaders):
+        self.loaders = engine.get_template_loaders(loaders)
+        super(Loader, self).__init__(engine)
+
+    def get_template_sources(self, template_name):
+        # Origins are this loader's, so that loaders wrapping it, like the cached
+        # loader, get the contents through `get_contents`
+        for loader in self.loaders:
+            for source_origin in loader.get_template_sources(template_name):
+                origin = Origin(name=source_origin.name, template_name=template_name, loader=self)
+                origin.source_origin = source_origin
+                yield origin
+
+    def get_contents(self, origin):
+        source_origin = origin.source_origin
+        contents = source_origin.loader.get_contents(source_origin)
+        if origin.template_name in getattr(settings, 'CRISPY_FLAT_TEMPLATES', FLAT_TEMPLATES):
+            contents = self.inline_includes(contents, [origin.template_name])
+        return contents
+
+    def get_source(self, template_name):
+        for loader in self.loaders:
+            for origin in loader.get_template_sources(template_name):
+                try:
+                    return loader.get_contents(origin)
+                except TemplateDoesNotExist:
+                    continue
+        raise TemplateDoesNotExist(template_name)
+
+    def inline_includes(self, contents, included):
+        """
+        Replaces every plain `{% include %}` in `contents` by the source of the
+        included template, recursively. `included` holds the chain of templates
+        being inlined, so a template including itself is left alone.
+        """
+        def inline(match):
+            template_name = match.group('template_name')
+            if template_name in included:
+                return match.group(0)
+            return self.inline_includes(self.get_source(template_name), included + [template_name])
+
+        return INCLUDE_RE.sub(inline, contents)
+
+    def reset(self):
+        for loader in self.loaders:
+            loader.reset()
@@ -0,0 +1,170 @@
+import threading
+import time
+from contextlib import contextmanager
+from functools import lru_cache
+
+from django.conf import settings
+from django.core.signals import setting_changed
+from django.dispatch import Signal, receiver
+from django.utils.module_loading import import_string
+
+# Sent with the profile of every layout rendered while `CRISPY_RENDER_PROFILING` is
+# set, as `profile`, along with the `form`
+layout_profiled = Signal()
+
+_local = threading.local()
+
+_enabled = None
+
+
+class RenderNode(object):
+    """
+    Profile of the render of one layout object: its class name, template, the wall
+    time it took in seconds, the number of form fields it rendered, the size of its
+    output and the nodes of the layout objects it holds.
+    """
+    def __init__(self, layout_object, template_pack):
+        self.layout_object = layout_object
+        self.name = layout_object.__class__.__name__
+        self.template = getattr(layout_object, 'template', None)
+        if self.template and '%s' in self.template:
+            self.template = self.template % template_pack
+        self.duration = 0.0
+        self.fields = 0
+        self.size = 0
+        self.children = []
+
+    def __iter__(self):
+        # Depth first, this node included
+        yield self
+        for child in self.children:
+            for node in child:
+                yield node
+
+    def as_dict(self):
+        return {
+            'name': self.name,
+            'template': self.template,
+            'duration': self.duration,
+            'fields': self.fields,
+            'size': self.size,
+            'children': [child.as_dict() for child in self.children],
+        }
+
+    def format(self, depth=0):
+        """
+        Returns the tree of this node as text, one line per node.
+        """
+        lines = ['%s%s%s: %.3f ms, %s fields, %s characters' % (
+            '  ' * depth, self.name, ' (%s)' % self.template if self.template else '',
+            self.duration * 1000, self.fields, self.size,
+        )]
+        for child in self.children:
+            lines.append(child.format(depth + 1))
+        return '\n'.join(lines)
+
+
+class RenderProfiler(object):
+    """
+    Collects the `RenderNode` trees of the layouts rendered on the thread it's
+    active on, in `roots`.
+    """
+    def __init__(self):
+        self.roots = []
+        self.stack = []
+
+    def profile(self, layout_object, form, template_pack, render, *args, **kwargs):
+        node = RenderNode(layout_object, template_pack)
+        (self.stack[-1].children if self.stack else self.roots).append(node)
+
+        rendered_fields = getattr(form, 'rendered_fields', ())
+        fields = len(rendered_fields)
+        self.stack.append(node)
+        start = time.perf_counter()
+        try:
+            html = render(*args, **kwargs)
+        finally:
+            node.duration = time.perf_counter() - start
+            self.stack.pop()
+        node.fields = len(getattr(form, 'rendered_fields', rendered_fields)) - fields
+        node.size = len(html)
+        return html
+
+
+def get_profiler():
+    """
+    Returns the `RenderProfiler` active on the current thread, `None` when layouts
+    aren't profiled.
+    """
+    return getattr(_local, 'profiler', None)
+
+
+@contextmanager
+def profile_render():
+    """
+    Profiles the layouts rendered within the block, on the current thread::
+
+        with profile_render() as profiler:
+            html = render_crispy_form(form)
+        print(profiler.roots[0].format())
+    """
+    previous = get_profiler()
+    _local.profiler = profiler = RenderProfiler()
+    try:
+        yield profiler
+    finally:
+        _local.profiler = previous
+
+
+def is_enabled():
+    """
+    Returns whether every layout render is profiled, as set by `CRISPY_RENDER_PROFILING`.
+    """
+    global _enabled
+
+    if _enabled is None:
+        _enabled = bool(getattr(settings, 'CRISPY_RENDER_PROFILING', False))
+    return _enabled
+
+
+@lru_cache()
+def get_sinks():
+    """
+    Returns the callables listed by dotted path in `CRISPY_RENDER_PROFILE_SINKS`.
+    """
+    return [import_string(path) for path in getattr(settings, 'CRISPY_RENDER_PROFILE_SINKS', ())]
+
+
+def profile_layout(layout, form, template_pack, render, *args, **kwargs):
+    """
+    Renders `layout` with `render`, profiling it when a profiler is active or when
+    `CRISPY_RENDER_PROFILING` is set. Profiles of the latter are passed to the
+    `CRISPY_RENDER_PROFILE_SINKS` callables and sent with `layout_profiled`.
+    """
+    profiler = get_profiler()
+    if profiler is not None:
+        if profiler.stack:
+            # Nested layouts are profiled by their container
+            return render(*args, **kwargs)
+        return profiler.profile(layout, form, template_pack, render, *args, **kwargs)
+
+    if not is_enabled():
+        return render(*args, **kwargs)
+
+    with profile_render() as profiler:
+        html = profiler.profile(layout, form, template_pack, render, *args, **kwargs)
+    node = profiler.roots[0]
+    for sink in get_sinks():
+        sink(node)
+    layout_profiled.send(sender=layout.__class__, profile=node, form=form)
+    return html
+
+
+@receiver(setting_changed)
+def _reset_profiling(**kwargs):
+    global _enabled
+
+    if kwargs['setting'] == 'CRISPY_RENDER_PROFILING':
+        _enabled = None
+    elif kwargs['setting'] == 'CRISPY_RENDER_PROFILE_SINKS':
+        get_sinks.cache_clear()
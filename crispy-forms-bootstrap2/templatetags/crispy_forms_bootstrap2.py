@@ -0,0 +1,133 @@
+from django import template
+from django.conf import settings
+from django.core.cache import caches
+from django.core.cache.backends.base import DEFAULT_TIMEOUT
+from django.forms.formsets import BaseFormSet
+from django.utils.html import conditional_escape
+from django.utils.safestring import mark_safe
+
+from crispy_forms.helper import FormHelper
+from crispy_forms.templatetags.crispy_forms_tags import CrispyFormNode, do_uni_form
+
+from ..choices import render_choices
+from ..formsets import FormsetWindow, get_table_renderer, render_empty_form, stream_formset
+from ..utils import get_fragment_cache_key
+from ..widgets import get_widget_kind
+
+register = template.Library()
+
+# Stands for the CSRF token in cached fragments, so they can be shared across users
+CSRF_TOKEN_PLACEHOLDER = 'CRISPY-FORMS-BOOTSTRAP2-CSRF-TOKEN'
+
+
+class CachedCrispyFormNode(CrispyFormNode):
+    """
+    `{% crispy %}` node that caches the rendered form when its helper has
+    `use_fragment_cache` set. Fragments are stored in the cache named by the
+    `CRISPY_FRAGMENT_CACHE` setting, `'default'` if not set, for the helper's
+    `fragment_cache_timeout` or the cache default timeout.
+
+    The CSRF token is replaced by a placeholder in cached fragments, so that they
+    can be shared by every visitor. Formsets are never cached, and neither are forms
+    whose layout renders strings against the context, unless the helper lists the
+    context variables they depend on in `fragment_cache_vary_on`.
+
+    Formsets whose helper has `formset_window` set only render that many forms,
+    see `FormsetWindow`.
+    """
+    def render(self, context):
+        actual_form = template.Variable(self.form).resolve(context)
+        if self.helper is not None:
+            helper = template.Variable(self.helper).resolve(context)
+        else:
+            helper = FormHelper() if not hasattr(actual_form, 'helper') else actual_form.helper
+
+        template_pack = getattr(helper, 'template_pack', None) or self.template_pack
+        if isinstance(actual_form, BaseFormSet) and getattr(helper, 'formset_window', None):
+            window = FormsetWindow(actual_form, stop=helper.formset_window)
+            return mark_safe(''.join(stream_formset(window, helper, context.flatten(), template_pack)))
+
+        if not getattr(helper, 'use_fragment_cache', False) or isinstance(actual_form, BaseFormSet):
+            return super(CachedCrispyFormNode, self).render(context)
+
+        # Reading the token generates it and varies the response on cookies, it's only
+        # read for forms `whole_uni_form.html` outputs it for, with or without a form tag
+        with_csrf_token = helper.form_method.lower() == 'post' and not helper.disable_csrf
+        if with_csrf_token:
+            csrf_token = context.get('csrf_token')
+            with_csrf_token = bool(csrf_token) and csrf_token != 'NOTPROVIDED'
+        key = get_fragment_cache_key(actual_form, helper, template_pack, with_csrf_token, context)
+        if key is None:
+            return super(CachedCrispyFormNode, self).render(context)
+
+        cache = caches[getattr(settings, 'CRISPY_FRAGMENT_CACHE', 'default')]
+        html = cache.get(key)
+        if html is None:
+            if with_csrf_token:
+                with context.push(csrf_token=CSRF_TOKEN_PLACEHOLDER):
+                    html = super(CachedCrispyFormNode, self).render(context)
+            else:
+                html = super(CachedCrispyFormNode, self).render(context)
+            cache.set(key, html, getattr(helper, 'fragment_cache_timeout', DEFAULT_TIMEOUT))
+
+        if with_csrf_token:
+            html = html.replace(CSRF_TOKEN_PLACEHOLDER, conditional_escape(csrf_token))
+        return mark_safe(html)
+
+
+# {% crispy %} tag
+@register.tag(name="crispy")
+def do_cached_uni_form(parser, token):
+    """
+    Same as `crispy_forms_tags`' `{% crispy %}` tag, rendering forms whose helper
+    has `use_fragment_cache` set through the fragment cache::
+
+        {% load crispy_forms_bootstrap2 %}
+        {% crispy form %}
+    """
+    node = do_uni_form(parser, token)
+    return CachedCrispyFormNode(node.form, node.helper, template_pack=node.template_pack)
+
+
+@register.simple_tag
+def table_inline_formset_header(formset):
+    """
+    Renders the header cells of `table_inline_formset.html`, computed once per formset.
+    """
+    return get_table_renderer(formset).render_header()
+
+
+@register.simple_tag(takes_context=True)
+def table_inline_formset_row(context, form, formset):
+    """
+    Renders the cells of `form` in `table_inline_formset.html`, reusing the parts of
+    each column shared by every row of `formset`.
+    """
+    return get_table_renderer(formset).render_row(form, context)
+
+
+@register.simple_tag(takes_context=True)
+def table_inline_formset_empty_form(context, formset):
+    """
+    Renders the empty form row of `table_inline_formset.html`, following the helper's
+    `formset_empty_form`.
+    """
+    return render_empty_form(formset, context)
+
+
+@register.simple_tag
+def crispy_choices(field, input_type, inline_class=None):
+    """
+    Renders the choices of `field` in `radioselect.html` and `checkboxselectmultiple.html`,
+    `input_type` being `radio` or `checkbox`.
+    """
+    return render_choices(field, input_type, inline_class)
+
+
+@register.filter
+def widget_kind(field):
+    """
+    Returns the `WidgetKind` of `field`, so templates branch on attributes of a kind
+    classified once per widget class instead of calling a filter per check.
+    """
+    return get_widget_kind(field)
@@ -1,7 +1,13 @@
 # coding: utf-8
+import copy
+
 import pytest
 
 from crispy_forms.layout import HTML, Div, Field, Fieldset, Layout, Submit
+from crispy_forms.templatetags.crispy_forms_tags import whole_uni_form_template
+from crispy_forms.utils import default_field_template
+
+from .utils import TEMPLATES_DIR
 
 
 only_bootstrap = pytest.mark.only('bootstrap')
@@ -28,6 +34,27 @@ def advanced_layout():
     )
 
 
+@pytest.fixture
+def clear_crispy_template_caches():
+    # crispy_forms caches templates, which would hold on to the previous engine
+    default_field_template.cache_clear()
+    whole_uni_form_template.cache_clear()
+    yield
+    default_field_template.cache_clear()
+    whole_uni_form_template.cache_clear()
+
+
+@pytest.fixture
+def app_templates(settings, clear_crispy_template_caches):
+    """
+    Makes the app templates take precedence over the crispy_forms ones, which the
+    test settings install first.
+    """
+    templates = copy.deepcopy(settings.TEMPLATES)
+    templates[0]['DIRS'] = [TEMPLATES_DIR] + list(templates[0]['DIRS'])
+    settings.TEMPLATES = templates
+
+
 @pytest.fixture(autouse=True, params=('bootstrap',))
 def template_packs(request, settings):
     check_template_pack(request.node, request.param)
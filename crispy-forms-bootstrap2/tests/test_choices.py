@@ -0,0 +1,134 @@
+# -*- coding: utf-8 -*-
+from importlib import import_module
+
+import pytest
+
+from django import forms
+from django.contrib.auth.models import Permission
+from django.template.loader import get_template
+from django.test.html import parse_html
+from django.utils.safestring import mark_safe
+
+from .forms import CheckboxesSampleForm
+from .utils import render_app_template
+
+choices = import_module('crispy-forms-bootstrap2.choices')
+
+
+class ChoicesForm(CheckboxesSampleForm):
+    labelled = forms.ChoiceField(
+        choices=((1, mark_safe('<b>One</b>')), (2, '<i>Two</i>')),
+        widget=forms.RadioSelect(attrs={'class': 'choice', 'data_role': 'radio'}),
+    )
+
+
+@pytest.mark.parametrize('data', [
+    None,
+    {'checkboxes': ['2', '3'], 'alphacheckboxes': [], 'inline_radios': 'option_one', 'labelled': '2'},
+])
+@pytest.mark.parametrize('inline_class', ['', 'inline'])
+def test_render_choices(data, inline_class):
+    form = ChoicesForm(data)
+    for name in ('checkboxes', 'alphacheckboxes', 'numeric_multiple_checkboxes', 'inline_radios', 'labelled'):
+        field = form[name]
+        template = 'bootstrap/layout/%s.html' % (
+            'radioselect' if isinstance(field.field.widget, forms.RadioSelect) else 'checkboxselectmultiple'
+        )
+        context = {'inline_class': inline_class, 'form_show_errors': True}
+
+        html = render_app_template(template, dict(context, field=field))
+        expected = get_template(template).render(dict(context, field=field))
+
+        assert parse_html(html) == parse_html(expected)
+
+
+def test_render_choices_selected():
+    form = ChoicesForm()
+    html = choices.render_choices(form['numeric_multiple_checkboxes'], 'checkbox', 'inline')
+
+    assert html.count('checked="checked"') == 2
+    assert '<label for="id_numeric_multiple_checkboxes_3" class="checkbox inline">' in html
+
+    html = choices.render_choices(form['labelled'], 'radio')
+    assert 'checked' not in html
+    assert '<b>One</b>' in html and '&lt;i&gt;Two&lt;/i&gt;' in html
+    assert 'value="1" class="choice" data-role="radio">' in html
+
+
+@pytest.mark.parametrize('value, selected', [
+    (None, {''}),
+    ('12', {'12'}),
+    (1, {'1'}),
+    ([1, '2'], {'1', '2'}),
+    ((value for value in (3, 4)), {'3', '4'}),
+])
+def test_get_selected_values(value, selected):
+    form = CheckboxesSampleForm(initial={'checkboxes': value})
+    assert choices.get_selected_values(form['checkboxes']) == selected
+
+
+def test_render_choices_substring():
+    # The old template checked `choice in value`, matching substrings of strings
+    form = CheckboxesSampleForm(initial={'checkboxes': '12'})
+    assert 'checked' not in choices.render_choices(form['checkboxes'], 'checkbox')
+
+
+@pytest.mark.django_db
+def test_model_choices(django_assert_num_queries, settings):
+    settings.CRISPY_CHOICES_CHUNK_SIZE = 10
+    queryset = Permission.objects.select_related('content_type').order_by('pk')
+    form_class = type('PermissionsForm', (forms.Form,), {
+        'permissions': forms.ModelMultipleChoiceField(queryset=queryset, widget=forms.CheckboxSelectMultiple),
+        'permission': forms.ModelChoiceField(queryset=queryset, widget=forms.RadioSelect),
+    })
+    permissions = list(Permission.objects.order_by('pk')[:2])
+    form = form_class(initial={'permissions': permissions, 'permission': permissions[1]})
+
+    with django_assert_num_queries(1):
+        html = choices.render_choices(form['permissions'], 'checkbox')
+        assert choices.render_choices(form['permissions'], 'checkbox') == html
+    assert html.count('<label') == Permission.objects.count()
+    assert html.count('checked="checked"') == 2
+
+    html = choices.render_choices(form['permission'], 'radio')
+    assert 'id="id_permission_1" value=""' in html
+    assert 'checked="checked" name="permission" id="id_permission_3" value="%s"' % permissions[1].pk in html
+
+    html = render_app_template('bootstrap/layout/radioselect.html', {'field': form['permission']})
+    expected = get_template('bootstrap/layout/radioselect.html').render({'field': form['permission']})
+    assert parse_html(html) == parse_html(expected)
+
+    # Choices follow a new queryset
+    form.fields['permissions'].queryset = queryset[:3]
+    assert choices.render_choices(form['permissions'], 'checkbox').count('<label') == 3
+
+
+def test_grouped_choices():
+    form_class = type('GroupedForm', (forms.Form,), {
+        'tags': forms.MultipleChoiceField(
+            choices=[
+                ('none', 'None'),
+                ('Fruits & nuts', [('apple', 'Apple'), ('pear', 'Pear')]),
+                ('Vegetables', (('leek', 'Leek'),)),
+            ],
+            widget=forms.CheckboxSelectMultiple,
+        ),
+    })
+    form = form_class(initial={'tags': ['pear', 'leek']})
+
+    html = choices.render_choices(form['tags'], 'checkbox', 'inline')
+
+    assert parse_html(html) == parse_html(
+        '<label for="id_tags_1" class="checkbox inline">'
+        '<input type="checkbox" name="tags" id="id_tags_1" value="none">None</label>'
+        '<div class="choice-group"><strong class="choice-group-label">Fruits &amp; nuts</strong>'
+        '<label for="id_tags_2" class="checkbox inline">'
+        '<input type="checkbox" name="tags" id="id_tags_2" value="apple">Apple</label>'
+        '<label for="id_tags_3" class="checkbox inline">'
+        '<input type="checkbox" checked="checked" name="tags" id="id_tags_3" value="pear">Pear</label>'
+        '</div>'
+        '<div class="choice-group"><strong class="choice-group-label">Vegetables</strong>'
+        '<label for="id_tags_4" class="checkbox inline">'
+        '<input type="checkbox" checked="checked" name="tags" id="id_tags_4" value="leek">Leek</label>'
+        '</div>'
+    )
@@ -0,0 +1,355 @@
+# -*- coding: utf-8 -*-
+from importlib import import_module
+
+import pytest
+
+from django.forms.models import formset_factory
+from django.http import StreamingHttpResponse
+from django.template import Context, Template
+from django.test.html import parse_html
+
+from crispy_forms.exceptions import FormHelpersException
+from crispy_forms.helper import FormHelper
+from crispy_forms.layout import HTML, Fieldset, Layout, Submit
+from crispy_forms.utils import render_crispy_form
+
+from .forms import CheckboxesSampleForm, SampleForm, SampleFormWithMultiValueField
+
+formsets = import_module('crispy-forms-bootstrap2.formsets')
+
+CONTEXT = {'csrf_token': 'ABCDEFGHIJKLMNOPQRSTUVWXYZ012345'}
+
+
+def get_helper(**kwargs):
+    helper = FormHelper()
+    helper.form_id = 'formset'
+    helper.add_input(Submit('submit', 'Submit'))
+    for name, value in kwargs.items():
+        setattr(helper, name, value)
+    return helper
+
+
+@pytest.mark.parametrize('template', ['bootstrap/table_inline_formset.html', None])
+def test_stream_formset(template):
+    SampleFormSet = formset_factory(SampleForm, extra=3)
+    helper = get_helper(template=template)
+
+    chunks = list(formsets.stream_formset(SampleFormSet(), helper, context=CONTEXT))
+    html = render_crispy_form(SampleFormSet(), helper=helper, context=CONTEXT)
+
+    assert len(chunks) == 5
+    assert chunks[0].startswith('<form')
+    assert 'name="form-TOTAL_FORMS"' in chunks[0]
+    assert chunks[-1].endswith('</form>')
+    assert parse_html(''.join(chunks)) == parse_html(html)
+
+
+def test_stream_formset_rows():
+    SampleFormSet = formset_factory(SampleForm, extra=2)
+    helper = get_helper(template='bootstrap/table_inline_formset.html')
+
+    chunks = list(formsets.stream_formset(SampleFormSet(), helper, context=CONTEXT))
+
+    assert '<th for="id_form-0-email"' in chunks[0]
+    assert 'empty-form' in chunks[0]
+    for i, chunk in enumerate(chunks[1:-1]):
+        assert chunk.startswith('<tr>') and chunk.endswith('</tr>')
+        assert 'name="form-%s-email"' % i in chunk
+
+
+@pytest.mark.parametrize('form_class', [SampleForm, CheckboxesSampleForm, SampleFormWithMultiValueField])
+@pytest.mark.parametrize('options', [
+    {},
+    {'html5_required': True, 'help_text_inline': True},
+    {'help_text_inline': True, 'error_text_inline': False, 'wrapper_class': 'cell'},
+    {'form_show_errors': False},
+])
+@pytest.mark.parametrize('cells_in_python', [False, True])
+def test_table_row_renderer(settings, app_templates, form_class, options, cells_in_python):
+    settings.CRISPY_TABLE_CELLS_IN_PYTHON = cells_in_python
+    FormSet = formset_factory(form_class, extra=1)
+    data = {'form-TOTAL_FORMS': '2', 'form-INITIAL_FORMS': '0', 'form-0-email': 'invalid', 'form-1-email': 'a@b.c'}
+    helper = get_helper(template='bootstrap/table_inline_formset.html', **options)
+
+    streamed = ''.join(formsets.stream_formset(FormSet(data), helper, context=CONTEXT))
+    html = render_crispy_form(FormSet(data), helper=helper, context=CONTEXT)
+
+    assert parse_html(streamed) == parse_html(html)
+
+
+def test_table_row_renderer_once_per_formset():
+    SampleFormSet = formset_factory(SampleForm, extra=3)
+    formset = SampleFormSet()
+    helper = get_helper(template='bootstrap/table_inline_formset.html')
+
+    list(formsets.stream_formset(formset, helper, context=CONTEXT))
+    renderer = formsets.get_table_renderer(formset)
+
+    assert renderer is formsets.get_table_renderer(formset)
+    assert renderer.names == list(SampleForm.base_fields)
+    assert list(renderer.columns[1].class_names.values()) == ['textinput textInput inputtext']
+
+
+class LockedForm(SampleForm):
+    def __init__(self, *args, **kwargs):
+        super(LockedForm, self).__init__(*args, **kwargs)
+        if self.prefix.endswith('-1'):
+            self.fields['email'].widget.attrs['class'] = 'locked'
+        else:
+            self.fields['email'].widget.attrs['class'] = 'editable'
+
+
+@pytest.mark.parametrize('cells_in_python', [False, True])
+def test_table_row_renderer_widget_classes(settings, app_templates, cells_in_python):
+    settings.CRISPY_TABLE_CELLS_IN_PYTHON = cells_in_python
+    LockedFormSet = formset_factory(LockedForm, extra=3)
+    helper = get_helper(template='bootstrap/table_inline_formset.html')
+
+    formset = LockedFormSet()
+    streamed = ''.join(formsets.stream_formset(formset, helper, context=CONTEXT))
+    html = render_crispy_form(LockedFormSet(), helper=helper, context=CONTEXT)
+
+    assert formsets.get_table_renderer(formset).cells_in_python is cells_in_python
+    assert 'class="locked textinput textInput inputtext"' in streamed
+    assert streamed.count('class="editable textinput textInput inputtext"') == 3
+    assert parse_html(streamed) == parse_html(html)
+
+
+def test_table_row_renderer_field_template_override(settings):
+    # The tests resolve crispy_forms' `field.html`, cells aren't built in Python for it
+    settings.CRISPY_TABLE_CELLS_IN_PYTHON = True
+    formset = formset_factory(SampleForm, extra=1)()
+    helper = get_helper(template='bootstrap/table_inline_formset.html')
+
+    streamed = ''.join(formsets.stream_formset(formset, helper, context=CONTEXT))
+
+    assert formsets.get_table_renderer(formset).cells_in_python is False
+    assert parse_html(streamed) == parse_html(render_crispy_form(formset, helper=helper, context=CONTEXT))
+
+
+def test_stream_formset_layout():
+    SampleFormSet = formset_factory(SampleForm, extra=2)
+    helper = get_helper(layout=Layout(
+        Fieldset('Item {{ forloop.counter }}', 'email'),
+        HTML('{% if forloop.first %}first{% endif %}'),
+    ))
+    formset = SampleFormSet()
+
+    stream = formsets.stream_formset(formset, helper, context=CONTEXT)
+    next(stream)
+    first = next(stream)
+    # Forms are only rendered when consumed
+    assert not hasattr(formset.forms[1], 'form_html')
+    second = next(stream)
+
+    assert 'Item 1' in first and 'first' in first
+    assert 'Item 2' in second and 'first' not in second
+    assert not hasattr(formset.forms[0], 'form_html')
+
+    html = render_crispy_form(SampleFormSet(), helper=helper, context=CONTEXT)
+    streamed = ''.join(formsets.stream_formset(SampleFormSet(), helper, context=CONTEXT))
+    assert parse_html(streamed) == parse_html(html)
+
+
+def test_stream_formset_response():
+    SampleFormSet = formset_factory(SampleForm, extra=1)
+    helper = get_helper(template='bootstrap/table_inline_formset.html', form_tag=False)
+
+    response = StreamingHttpResponse(formsets.stream_formset(SampleFormSet(), helper, context=CONTEXT))
+    html = b''.join(response.streaming_content).decode('utf-8')
+
+    assert '<form' not in html
+    assert 'name="form-0-email"' in html
+    assert 'csrfmiddlewaretoken' in html
+
+
+def test_stream_formset_unsupported_template():
+    SampleFormSet = formset_factory(SampleForm, extra=1)
+    helper = get_helper(template='bootstrap/uni_formset.html')
+
+    with pytest.raises(FormHelpersException):
+        next(formsets.stream_formset(SampleFormSet(), helper))
+
+
+def test_formset_window():
+    SampleFormSet = formset_factory(SampleForm, extra=2)
+    formset = SampleFormSet(initial=[{'email': 'user%s@example.com' % i} for i in range(10)])
+    helper = get_helper(template='bootstrap/table_inline_formset.html')
+
+    window = formsets.FormsetWindow(formset, stop=4)
+    html = ''.join(formsets.stream_formset(window, helper, context=CONTEXT))
+
+    assert 'forms' not in formset.__dict__
+    assert html.count('<tr>') == 5
+    assert 'name="form-3-email"' in html
+    assert 'name="form-4-email"' not in html
+    assert 'name="form-TOTAL_FORMS" value="4"' in html
+    assert 'name="form-INITIAL_FORMS" value="4"' in html
+
+    window = formsets.FormsetWindow(formset, stop=100)
+    assert window.total_form_count() == 12
+    assert window.initial_form_count() == 10
+
+
+def test_render_formset_rows():
+    SampleFormSet = formset_factory(SampleForm, extra=20)
+    formset = SampleFormSet()
+    helper = get_helper(template='bootstrap/table_inline_formset.html')
+
+    html = formsets.render_formset_rows(formset, 5, 8, helper, context=CONTEXT)
+
+    assert html.count('<tr>') == 3
+    assert 'name="form-5-email"' in html
+    assert 'name="form-7-email"' in html
+    assert 'name="form-8-email"' not in html
+    assert 'TOTAL_FORMS' not in html
+    assert '<form' not in html and '<th' not in html
+    assert 'forms' not in formset.__dict__
+
+
+
+@pytest.mark.parametrize('start, stop, rendered', [
+    (-3, 2, [0, 1]),
+    (-3, -1, []),
+    (2, -1, []),
+    (18, 30, [18, 19]),
+])
+def test_render_formset_rows_out_of_bounds(start, stop, rendered):
+    SampleFormSet = formset_factory(SampleForm, extra=20)
+    helper = get_helper(template='bootstrap/table_inline_formset.html')
+
+    window = formsets.FormsetWindow(SampleFormSet(), start, stop)
+    html = formsets.render_formset_rows(SampleFormSet(), start, stop, helper, context=CONTEXT)
+
+    assert 0 <= window.start <= window.stop <= 20
+    assert html.count('<tr>') == len(rendered)
+    for i in rendered:
+        assert 'name="form-%s-email"' % i in html
+    assert 'form--' not in html
+
+def test_windowed_formset_is_valid():
+    SampleFormSet = formset_factory(SampleForm, extra=0)
+    initial = [{'email': 'user%s@example.com' % i} for i in range(10)]
+    management_form = formsets.FormsetWindow(SampleFormSet(initial=initial), stop=3).management_form
+
+    data = {
+        'form-%s' % name: management_form[name].value() for name in management_form.fields
+    }
+    for i in range(3):
+        data.update({
+            'form-%s-email' % i: 'user%s@example.com' % i,
+            'form-%s-password1' % i: 'password',
+            'form-%s-password2' % i: 'password',
+            'form-%s-first_name' % i: 'first',
+            'form-%s-last_name' % i: 'last',
+            'form-%s-datetime_field_0' % i: '2020-01-01',
+            'form-%s-datetime_field_1' % i: '12:00',
+        })
+    formset = SampleFormSet(data, initial=initial)
+
+    assert formset.total_form_count() == 3
+    assert formset.is_valid(), formset.errors
+
+
+def test_crispy_formset_window():
+    template = Template("""
+        {% load crispy_forms_bootstrap2 %}
+        {% crispy formset helper %}
+    """)
+    SampleFormSet = formset_factory(SampleForm, extra=10)
+    helper = get_helper(formset_window=3)
+
+    html = template.render(Context({'formset': SampleFormSet(), 'helper': helper}))
+
+    assert 'name="form-TOTAL_FORMS" value="3"' in html
+    assert 'name="form-2-email"' in html
+    assert 'name="form-3-email"' not in html
+
+
+class CountedForm(SampleForm):
+    instances = 0
+
+    def __init__(self, *args, **kwargs):
+        CountedForm.instances += 1
+        super(CountedForm, self).__init__(*args, **kwargs)
+
+
+def test_empty_form_template():
+    formsets._empty_form_templates.clear()
+    CountedFormSet = formset_factory(CountedForm, extra=2)
+    helper = get_helper(template='bootstrap/table_inline_formset.html', formset_empty_form='template')
+
+    html = ''.join(formsets.stream_formset(CountedFormSet(), helper, context=CONTEXT))
+    assert html.count('<template class="empty-form"><tr>') == 1
+    assert 'name="form-__prefix__-email"' in html
+    assert 'hidden empty-form' not in html
+
+    CountedForm.instances = 0
+    assert ''.join(formsets.stream_formset(CountedFormSet(), helper, context=CONTEXT)) == html
+    assert CountedForm.instances == 2
+
+    # Other prefixes and options get their own template
+    other = ''.join(formsets.stream_formset(CountedFormSet(prefix='other'), helper, context=CONTEXT))
+    assert 'name="other-__prefix__-email"' in other
+    helper.html5_required = True
+    CountedForm.instances = 0
+    ''.join(formsets.stream_formset(CountedFormSet(), helper, context=CONTEXT))
+    assert CountedForm.instances == 3
+    formsets._empty_form_templates.clear()
+
+
+
+def test_empty_form_template_factory_per_request(monkeypatch):
+    formsets._empty_form_templates.clear()
+    helper = get_helper(template='bootstrap/table_inline_formset.html', formset_empty_form='template')
+
+    def render(**factory_options):
+        CountedForm.instances = 0
+        formset = formset_factory(CountedForm, **dict({'extra': 1}, **factory_options))()
+        html = ''.join(formsets.stream_formset(formset, helper, context=CONTEXT))
+        return html, CountedForm.instances
+
+    # Formset classes built per request share their empty form template
+    html, instances = render()
+    assert instances == 2
+    assert render() == (html, 1)
+
+    # Unless the factory options change the empty form
+    html, instances = render(can_delete=True)
+    assert instances == 2 and 'name="form-__prefix__-DELETE"' in html
+
+    # The least recently used templates are evicted first
+    monkeypatch.setattr(formsets, 'EMPTY_FORM_CACHE_SIZE', 2)
+    render()
+    render(can_order=True)
+    assert len(formsets._empty_form_templates) == 2
+    assert render()[1] == 1
+    assert render(can_delete=True)[1] == 2
+    formsets._empty_form_templates.clear()
+
+
+def test_empty_form_template_empty_formset():
+    formsets._empty_form_templates.clear()
+    CountedFormSet = formset_factory(CountedForm, extra=0)
+    # `formset.is_multipart()`, read for the form tag, builds the empty form of formsets without forms
+    helper = get_helper(template='bootstrap/table_inline_formset.html', formset_empty_form='template', form_tag=False)
+
+    html = ''.join(formsets.stream_formset(CountedFormSet(), helper, context=CONTEXT))
+    assert 'name="form-__prefix__-email"' in html
+
+    # Columns are only built on a miss, a cached empty form template builds no form
+    CountedForm.instances = 0
+    assert ''.join(formsets.stream_formset(CountedFormSet(), helper, context=CONTEXT)) == html
+    assert CountedForm.instances == 0
+    formsets._empty_form_templates.clear()
+
+def test_empty_form_omitted():
+    CountedFormSet = formset_factory(CountedForm, extra=2)
+    helper = get_helper(template='bootstrap/table_inline_formset.html', formset_empty_form=None)
+
+    CountedForm.instances = 0
+    html = ''.join(formsets.stream_formset(CountedFormSet(), helper, context=CONTEXT))
+
+    assert 'empty-form' not in html
+    assert '__prefix__' not in html
+    assert CountedForm.instances == 2
@@ -0,0 +1,421 @@
+# -*- coding: utf-8 -*-
+import asyncio
+import copy
+import pickle
+import threading
+from importlib import import_module
+
+import pytest
+
+from django import forms
+from django.contrib.auth.models import Permission
+from django.template import Context
+from django.utils import translation
+from django.utils.translation import ugettext_lazy as _
+
+from crispy_forms import layout as crispy_layout
+from crispy_forms.exceptions import DynamicError
+from crispy_forms.helper import FormHelper
+from crispy_forms.utils import render_crispy_form
+
+from .forms import SampleForm
+
+# The app directory is not a valid identifier, so it can't be imported relatively
+layout = import_module('crispy-forms-bootstrap2.layout')
+utils = import_module('crispy-forms-bootstrap2.utils')
+
+
+def test_static_strings_are_not_compiled():
+    utils.clear_compiled_template_cache()
+    form = SampleForm()
+    form.helper = FormHelper()
+    form.helper.layout = layout.Layout(
+        layout.Fieldset(
+            'Static legend',
+            'email',
+            layout.HTML('<p class="static">&amp; static</p>'),
+        ),
+        layout.Submit('save', 'Save'),
+    )
+
+    html = render_crispy_form(form)
+    assert '<legend>Static legend</legend>' in html
+    assert '<p class="static">&amp; static</p>' in html
+    assert 'value="Save"' in html
+    assert utils.compiled_template_cache_info().currsize == 0
+
+
+def test_template_strings_are_rendered():
+    form = SampleForm()
+    form.helper = FormHelper()
+    form.helper.layout = layout.Layout(
+        layout.Fieldset('Legend for {{ name }}', 'email'),
+        layout.HTML('{% if name %}<p>{{ name }}</p>{% endif %}'),
+        layout.Submit('save', 'Save {{ name }}'),
+    )
+
+    html = render_crispy_form(form, context={'name': 'crispy'})
+    assert '<legend>Legend for crispy</legend>' in html
+    assert '<p>crispy</p>' in html
+    assert 'value="Save crispy"' in html
+
+
+def test_template_string_attributes():
+    html = layout.HTML('{{ name }}')
+    assert html.html == '{{ name }}'
+
+    html.html = 'static'
+    assert html.render(None, None, Context()) == 'static'
+
+
+def test_compile_layout():
+    div = layout.Div('password1', layout.HTML('<hr>'))
+    test_layout = layout.Layout('email', None, div)
+
+    plan = test_layout.compile('bootstrap')
+    assert plan == (
+        (layout.PLAN_FIELD, 'email'),
+        (layout.PLAN_LAYOUT_OBJECT, div),
+    )
+    assert test_layout.compile('bootstrap') is plan
+    assert div.compile('bootstrap')[1][0] == layout.PLAN_HTML
+
+
+class Badge(layout.HTML):
+    def render(self, form, form_style, context, template_pack=layout.TEMPLATE_PACK, **kwargs):
+        return '<span class="badge">%s</span>' % super(Badge, self).render(form, form_style, context, template_pack)
+
+
+def test_compile_html_subclass():
+    badge = Badge('new')
+    test_layout = layout.Layout(badge, layout.HTML('<hr>'))
+
+    assert [kind for kind, value in test_layout.compile('bootstrap')] == [layout.PLAN_LAYOUT_OBJECT, layout.PLAN_HTML]
+
+    form = SampleForm()
+    form.helper = FormHelper()
+    form.helper.layout = test_layout
+    assert '<span class="badge">new</span>' in render_crispy_form(form)
+
+
+def test_compile_invalidation():
+    test_layout = layout.Layout('email')
+    plan = test_layout.compile('bootstrap')
+
+    test_layout.append('password1')
+    assert test_layout.compile('bootstrap') == plan + ((layout.PLAN_FIELD, 'password1'),)
+
+    test_layout[0] = 'first_name'
+    del test_layout[1]
+    assert test_layout.compile('bootstrap') == ((layout.PLAN_FIELD, 'first_name'),)
+
+    test_layout.fields.insert(0, 'last_name')
+    assert test_layout.compile('bootstrap')[0] == (layout.PLAN_FIELD, 'last_name')
+
+
+def test_compiled_layout_rendering():
+    form = SampleForm()
+    form.helper = FormHelper()
+    form.helper.layout = layout.Layout(layout.Div('email'), 'password1')
+    render_crispy_form(form)
+
+    form.helper.layout[0].append('password2')
+    html = render_crispy_form(form)
+    assert 'id="id_password2"' in html
+
+
+def test_rendering_in_context_matches_crispy_forms():
+    def build_layout(module):
+        return module.Layout(
+            module.MultiField(
+                'Name', 'first_name', 'last_name', field_template='%s/layout/multifield.html'
+            ),
+            module.ButtonHolder(
+                module.Submit('save', 'Save {{ name }}'),
+                module.Button('cancel', 'Cancel', css_class='cancel'),
+            ),
+        )
+
+    form = SampleForm(data={})
+    form.helper = FormHelper()
+    form.helper.layout = build_layout(crispy_layout)
+    expected = render_crispy_form(form, context={'name': 'crispy'})
+
+    form = SampleForm(data={})
+    form.helper = FormHelper()
+    form.helper.layout = build_layout(layout)
+    assert render_crispy_form(form, context={'name': 'crispy'}) == expected
+
+
+def test_rendering_in_context_leaves_context_untouched():
+    context = Context({'form_show_errors': True})
+    html = layout.ButtonHolder(layout.Submit('save', 'Save')).render(
+        SampleForm(), '', context, template_pack='bootstrap'
+    )
+
+    assert 'value="Save"' in html
+    assert 'buttonholder' not in context
+    assert 'input' not in context
+
+
+def test_resolved_template_cache():
+    div = layout.Div('email')
+    template = div.get_template('bootstrap')
+
+    assert template.template.name == 'bootstrap/layout/div.html'
+    assert layout.Div('password1').get_template('bootstrap') is template
+
+    div.template = 'custom_field_template.html'
+    assert div.get_template('bootstrap').template.name == 'custom_field_template.html'
+
+
+def test_layout_index():
+    test_layout = layout.Layout(
+        layout.Div(layout.Div('email'), layout.HTML('extra text')),
+        layout.Fieldset('legend', 'first_name', layout.Row('password1')),
+        'last_name',
+    )
+
+    layout_index = test_layout.get_layout_index()
+    assert test_layout.get_layout_index() is layout_index
+    assert layout_index.fields['password1'] == [[1, 1, 0]]
+    assert test_layout.get_layout_objects(layout.Div) == [[[0], 'div']]
+    assert test_layout.get_layout_objects(layout.Div, max_level=1) == [
+        [[0], 'div'], [[0, 0], 'div'], [[1, 1], 'row'],
+    ]
+    assert list(test_layout.iter_layout_objects(str, greedy=True)) == test_layout.get_field_names()
+
+    test_layout[1][1].append('password2')
+    assert test_layout.get_field_names()[-2] == [[1, 1, 1], 'password2']
+
+
+def test_multifield_errors_do_not_change_layout_object():
+    multifield = layout.MultiField('Names', 'first_name', 'last_name')
+    form = SampleForm(data={'first_name': 'too long name'})
+    form.is_valid()
+
+    for i in range(2):
+        html = multifield.render(form, '', Context({'form_show_errors': True}), template_pack='uni_form')
+        assert html.count('class="ctrlHolder error"') == 1
+
+    assert multifield.css_class == 'ctrlHolder'
+    assert not hasattr(multifield, 'bound_fields')
+
+
+def test_rendering_does_not_change_inputs():
+    submit = layout.Submit('save', 'Save {{ name }}')
+    html = submit.render(SampleForm(), '', Context({'name': 'crispy'}), template_pack='bootstrap')
+
+    assert 'value="Save crispy"' in html
+    assert submit.value == 'Save {{ name }}'
+
+
+def test_frozen_layout():
+    test_layout = layout.Layout(
+        layout.Div(layout.Field('email', css_class='email'), layout.HTML('<hr>')),
+        layout.Submit('save', 'Save'),
+    ).freeze()
+
+    with pytest.raises(DynamicError):
+        test_layout.append('password1')
+    with pytest.raises(DynamicError):
+        test_layout[0][0] = 'password1'
+    with pytest.raises(DynamicError):
+        del test_layout[1]
+    with pytest.raises(DynamicError):
+        test_layout[1].value = 'Send'
+    with pytest.raises(DynamicError):
+        test_layout[0][0].attrs['class'] = 'password'
+
+    form = SampleForm()
+    form.helper = FormHelper()
+    form.helper.layout = test_layout
+    html = render_crispy_form(form)
+    assert 'class="email textinput' in html
+    assert render_crispy_form(form) == html
+
+    for copied_layout in (copy.deepcopy(test_layout), pickle.loads(pickle.dumps(test_layout))):
+        form.helper.layout = copied_layout
+        assert render_crispy_form(form) == html
+
+
+def run(coroutine):
+    loop = asyncio.new_event_loop()
+    try:
+        return loop.run_until_complete(coroutine)
+    finally:
+        loop.close()
+
+
+def get_form(**kwargs):
+    # As `FormHelper.render_layout` prepares forms
+    form = SampleForm(**kwargs)
+    form.rendered_fields = set()
+    form.crispy_field_template = None
+    return form
+
+
+def build_async_layout():
+    return layout.Layout(
+        layout.Fieldset(
+            'Contact {{ name }}',
+            'email',
+            layout.Div(layout.Field('password1', css_class='secret'), 'password2', css_class='passwords'),
+            layout.HTML('<p>{{ name }}</p>'),
+        ),
+        layout.MultiField('Name', 'first_name', 'last_name', field_template='%s/layout/multifield.html'),
+        layout.ButtonHolder(layout.Submit('save', 'Save {{ name }}')),
+    )
+
+
+@pytest.mark.parametrize('concurrent', [False, True])
+def test_arender(concurrent):
+    layout_object = build_async_layout()
+    context = Context({'name': 'crispy', 'form_show_errors': True, 'form_show_labels': True})
+    expected = layout_object.render(get_form(data={}), '', context, template_pack='bootstrap')
+
+    form = get_form(data={})
+    html = run(layout_object.arender(form, '', context, template_pack='bootstrap', concurrent=concurrent))
+
+    assert html == expected
+    assert 'first_name' in form.rendered_fields
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize('concurrent', [False, True])
+def test_arender_model_choice_field(concurrent):
+    form_class = type('PermissionForm', (SampleForm,), {
+        'permission': forms.ModelChoiceField(queryset=Permission.objects.order_by('pk')),
+    })
+    layout_object = layout.Layout(layout.Div('permission', layout.HTML('<hr>')), 'email')
+    context = Context({'form_show_errors': True, 'form_show_labels': True})
+
+    form = form_class()
+    form.rendered_fields = set()
+    form.crispy_field_template = None
+    # Under a running loop, the queryset is only evaluated off the event loop
+    html = asyncio.run(layout_object.arender(form, '', context, template_pack='bootstrap', concurrent=concurrent))
+
+    assert '<option value="%s">' % Permission.objects.order_by('pk')[0].pk in html
+    assert 'id_email' in html
+
+
+def test_arender_concurrent_siblings():
+    events = []
+
+    class SlowObject(layout.LayoutObject):
+        def __init__(self, name, delay):
+            self.fields = []
+            self.name = name
+            self.delay = delay
+
+        def render(self, form, form_style, context, template_pack=None, **kwargs):
+            return '<%s>' % self.name
+
+        async def arender(self, form, form_style, context, template_pack=None, **kwargs):
+            events.append('start %s' % self.name)
+            await asyncio.sleep(self.delay)
+            events.append('end %s' % self.name)
+            return self.render(form, form_style, context)
+
+    layout_object = layout.Layout(layout.Div(SlowObject('a', 0.02)), SlowObject('b', 0), 'email')
+    context = Context({'form_show_errors': True, 'form_show_labels': True})
+
+    html = run(layout_object.arender(get_form(), '', context, template_pack='bootstrap', concurrent=True))
+    # Siblings are awaited together, their output is joined in order
+    assert sorted(events[:2]) == ['start a', 'start b']
+    assert events[2:] == ['end b', 'end a']
+    assert html.index('<a>') < html.index('<b>') < html.index('id_email')
+
+    del events[:]
+    run(layout_object.arender(get_form(), '', context, template_pack='bootstrap'))
+    assert events == ['start a', 'end a', 'start b', 'end b']
+
+
+class ParallelForm(SampleForm):
+    password1 = forms.CharField(label=_('Password'), max_length=30, widget=forms.PasswordInput())
+    cleaned = 0
+
+    def clean(self):
+        self.cleaned += 1
+        return super(ParallelForm, self).clean()
+
+
+def build_parallel_layout():
+    return layout.Layout(
+        layout.Fieldset('Contact', 'email', layout.Div('password1', 'password2')),
+        layout.HTML('<hr>'),
+        layout.Div('first_name', 'last_name'),
+        'is_company',
+    )
+
+
+def test_render_in_parallel(settings, monkeypatch):
+    settings.CRISPY_PARALLEL_RENDER_MIN_FIELDS = 2
+    threads = set()
+    closed = set()
+    render_subtree = layout.render_subtree
+    close_all = layout.connections.close_all
+
+    def record_thread(*args):
+        threads.add(threading.current_thread())
+        return render_subtree(*args)
+
+    def record_close():
+        closed.add(threading.current_thread())
+        close_all()
+
+    monkeypatch.setattr(layout, 'render_subtree', record_thread)
+    monkeypatch.setattr(layout.connections, 'close_all', record_close)
+    form = ParallelForm({'email': 'invalid', 'password1': 'one', 'password2': 'two'})
+    form.helper = FormHelper()
+    form.helper.layout = build_parallel_layout()
+    form.helper.parallel_render = True
+    with translation.override('fr'):
+        html = render_crispy_form(form)
+        form.helper.parallel_render = False
+        expected = render_crispy_form(form)
+
+    assert html == expected
+    assert 'Mot de passe' in html and 'error' in html
+    assert len(threads) >= 1 and threading.current_thread() not in threads
+    assert closed == threads
+    # The form was cleaned once, on the calling thread, and knows what the workers rendered
+    assert form.cleaned == 1
+    assert form.rendered_fields == {'email', 'password1', 'password2', 'first_name', 'last_name', 'is_company'}
+
+
+@pytest.mark.django_db
+def test_render_in_parallel_database_subtrees(settings, monkeypatch):
+    settings.CRISPY_PARALLEL_RENDER_MIN_FIELDS = 1
+    monkeypatch.setattr(layout, 'render_subtree', None)
+    form_class = type('PermissionForm', (SampleForm,), {
+        'permission': forms.ModelChoiceField(queryset=Permission.objects.order_by('pk')),
+    })
+    form = form_class()
+    form.helper = FormHelper()
+    form.helper.layout = layout.Layout(
+        layout.Div('email', 'permission'),
+        layout.Fieldset('{{ legend }}', 'first_name'),
+        layout.Div('last_name'),
+    )
+    form.helper.parallel_render = True
+
+    # Subtrees querying the database, or rendering the context, stay on the current thread
+    html = render_crispy_form(form, context={'legend': 'Names'})
+    assert '<option value="%s">' % Permission.objects.order_by('pk')[0].pk in html
+    assert 'Names' in html
+
+
+def test_render_in_parallel_small_subtrees(settings, monkeypatch):
+    monkeypatch.setattr(layout, 'render_subtree', None)
+    form = SampleForm()
+    form.helper = FormHelper()
+    form.helper.layout = build_parallel_layout()
+    form.helper.parallel_render = True
+
+    # Subtrees are below the default size, they are rendered on the current thread
+    assert 'id_first_name' in render_crispy_form(form)
+
+    settings.CRISPY_PARALLEL_RENDER_MIN_FIELDS = 3
+    assert 'id_first_name' in render_crispy_form(form)
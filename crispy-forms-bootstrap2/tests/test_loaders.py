@@ -0,0 +1,81 @@
+# -*- coding: utf-8 -*-
+import copy
+from importlib import import_module
+
+import pytest
+
+from django.template.loader import get_template
+
+from crispy_forms.helper import FormHelper
+from crispy_forms.templatetags.crispy_forms_tags import whole_uni_form_template
+from crispy_forms.utils import default_field_template, render_crispy_form
+
+from .forms import CheckboxesSampleForm, SampleForm
+
+loaders = import_module('crispy-forms-bootstrap2.loaders')
+
+
+# The loader is tested against the app templates, the test settings would resolve
+# the crispy_forms ones
+pytestmark = pytest.mark.usefixtures('app_templates')
+
+
+def use_flat_templates_loader(settings, cached=False):
+    templates = copy.deepcopy(settings.TEMPLATES)
+    templates[0]['APP_DIRS'] = False
+    templates[0]['OPTIONS']['loaders'] = [
+        ('crispy-forms-bootstrap2.loaders.Loader', [
+            'django.template.loaders.filesystem.Loader',
+            'django.template.loaders.app_directories.Loader',
+        ]),
+    ]
+    if cached:
+        templates[0]['OPTIONS']['loaders'] = [
+            ('django.template.loaders.cached.Loader', templates[0]['OPTIONS']['loaders']),
+        ]
+    settings.TEMPLATES = templates
+
+
+@pytest.mark.parametrize('cached', [False, True])
+def test_flat_field_template(settings, cached):
+    use_flat_templates_loader(settings, cached)
+
+    source = get_template('bootstrap/field.html').template.source
+    assert '{% with kind=field|widget_kind %}' in source
+    assert '{% include' not in source
+    assert 'id="hint_{{ field.auto_id }}"' in source
+    assert '{% crispy_choices field' in source
+    assert '{% include' in get_template('bootstrap/uni_form.html').template.source
+
+
+def test_flat_field_template_cached(settings, monkeypatch):
+    use_flat_templates_loader(settings, cached=True)
+    calls = []
+    inline_includes = loaders.Loader.inline_includes
+
+    def count_inline_includes(self, contents, included):
+        calls.append(included)
+        return inline_includes(self, contents, included)
+
+    monkeypatch.setattr(loaders.Loader, 'inline_includes', count_inline_includes)
+
+    template = get_template('bootstrap/field.html')
+    assert get_template('bootstrap/field.html').template is template.template
+    assert '{% include' not in template.template.source
+    assert calls.count(['bootstrap/field.html']) == 1
+
+
+@pytest.mark.parametrize('cached', [False, True])
+def test_flat_field_template_output(settings, cached):
+    forms = [SampleForm(), SampleForm(data={'email': 'invalid'}), CheckboxesSampleForm()]
+    for form in forms:
+        form.helper = FormHelper()
+        form.helper.form_tag = False
+
+    expected = [render_crispy_form(form) for form in forms]
+    assert 'id="id_checkboxes_1" value="1"' in expected[2]
+
+    use_flat_templates_loader(settings, cached)
+    default_field_template.cache_clear()
+    whole_uni_form_template.cache_clear()
+    assert [render_crispy_form(form) for form in forms] == expected
@@ -0,0 +1,96 @@
+# -*- coding: utf-8 -*-
+from importlib import import_module
+
+from django.template import Context
+
+from crispy_forms.helper import FormHelper
+from crispy_forms.utils import render_crispy_form
+
+from .forms import SampleForm
+
+layout = import_module('crispy-forms-bootstrap2.layout')
+profiling = import_module('crispy-forms-bootstrap2.profiling')
+
+profiles = []
+
+
+def collect_profile(node):
+    profiles.append(node)
+
+
+def get_form():
+    form = SampleForm()
+    form.helper = FormHelper()
+    form.helper.layout = layout.Layout(
+        layout.Fieldset(
+            'Contact',
+            'email',
+            layout.Div(layout.Field('password1'), 'password2'),
+            layout.HTML('<hr>'),
+        ),
+        layout.Layout('first_name'),
+        'last_name',
+        layout.Submit('save', 'Save'),
+    )
+    return form
+
+
+def test_profile_render():
+    form = get_form()
+    with profiling.profile_render() as profiler:
+        html = render_crispy_form(form)
+
+    assert len(profiler.roots) == 1
+    root = profiler.roots[0]
+    assert [node.name for node in root] == [
+        'Layout', 'Fieldset', 'Div', 'Field', 'HTML', 'Layout', 'Submit',
+    ]
+    assert root.fields == 5
+    assert 'id_last_name' in html
+    assert root.size > sum(child.size for child in root.children) > 0
+    assert root.duration >= sum(child.duration for child in root.children)
+
+    fieldset, nested_layout, submit = root.children
+    assert fieldset.template == 'bootstrap/layout/fieldset.html'
+    assert fieldset.fields == 3
+    assert fieldset.children[0].children[0].template == 'bootstrap/field.html'
+    assert nested_layout.fields == 1
+    assert submit.fields == 0 and submit.size == len(layout.Submit('save', 'Save').render(
+        form, '', Context(), template_pack='bootstrap'
+    ))
+
+    tree = root.as_dict()
+    assert tree['children'][0]['children'][1] == {
+        'name': 'HTML', 'template': None, 'duration': fieldset.children[1].duration,
+        'fields': 0, 'size': 4, 'children': [],
+    }
+    assert root.format().splitlines()[1].startswith('  Fieldset (bootstrap/layout/fieldset.html): ')
+
+
+def test_profiling_disabled():
+    assert profiling.get_profiler() is None
+    profiles[:] = []
+    render_crispy_form(get_form())
+    assert profiles == []
+
+
+def test_profiling_setting(settings):
+    received = []
+
+    def receive(sender, profile, form, **kwargs):
+        received.append((sender, profile, form))
+
+    profiles[:] = []
+    settings.CRISPY_RENDER_PROFILING = True
+    settings.CRISPY_RENDER_PROFILE_SINKS = ['%s.collect_profile' % __name__]
+    profiling.layout_profiled.connect(receive)
+    try:
+        form = get_form()
+        render_crispy_form(form)
+    finally:
+        profiling.layout_profiled.disconnect(receive)
+
+    assert len(profiles) == 1
+    assert profiles[0].name == 'Layout' and len(profiles[0].children) == 3
+    assert received == [(layout.Layout, profiles[0], form)]
+    assert profiling.get_profiler() is None
@@ -1,18 +1,29 @@
 # -*- coding: utf-8 -*-
 from __future__ import unicode_literals
 
+from importlib import import_module
+
 import pytest
 
+from django import forms
+from django.contrib.auth.models import Permission
+from django.core.cache import caches
 from django.forms.forms import BoundField
 from django.forms.models import formset_factory
 from django.template import Context, Template
+from django.utils.functional import SimpleLazyObject
 
 from crispy_forms.exceptions import CrispyError
+from crispy_forms.helper import FormHelper
+from crispy_forms.layout import HTML as CrispyHTML
 from crispy_forms.templatetags.crispy_forms_field import crispy_addon
 
 from .conftest import only_bootstrap
 from .forms import SampleForm
 
+layout = import_module('crispy-forms-bootstrap2.layout')
+utils = import_module('crispy-forms-bootstrap2.utils')
+
 
 def test_crispy_field():
     template = Template("""
@@ -212,3 +223,139 @@ def test_crispy_addon(settings):
         crispy_addon()
     with pytest.raises(TypeError):
         crispy_addon(bound_field)
+
+
+def test_crispy_fragment_cache():
+    caches['default'].clear()
+    template = Template("""
+        {% load crispy_forms_bootstrap2 %}
+        {% crispy form %}
+    """)
+
+    form = SampleForm()
+    form.helper = FormHelper()
+    form.helper.use_fragment_cache = True
+    html = template.render(Context({'form': form, 'csrf_token': 'first-token'}))
+    assert 'value="first-token"' in html
+    assert len(caches['default']._cache) == 1
+
+    # The cached fragment is reused, with the CSRF token of the new render
+    form = SampleForm()
+    form.helper = FormHelper()
+    form.helper.use_fragment_cache = True
+    cached_html = template.render(Context({'form': form, 'csrf_token': 'second-token'}))
+    assert cached_html == html.replace('first-token', 'second-token')
+
+    # Bound data is part of the key
+    form = SampleForm(data={'email': 'invalid'})
+    form.helper = FormHelper()
+    form.helper.use_fragment_cache = True
+    bound_html = template.render(Context({'form': form, 'csrf_token': 'second-token'}))
+    assert 'value="invalid"' in bound_html
+
+
+@pytest.mark.parametrize('helper_attributes, with_csrf_token', [
+    ({'disable_csrf': True}, False),
+    ({'form_method': 'get'}, False),
+    ({'form_tag': False}, True),
+])
+def test_crispy_fragment_cache_csrf_token(helper_attributes, with_csrf_token):
+    caches['default'].clear()
+    template = Template("""
+        {% load crispy_forms_bootstrap2 %}
+        {% crispy form %}
+    """)
+    read = []
+
+    def get_token():
+        read.append(True)
+        return 'secret-token'
+
+    form = SampleForm()
+    form.helper = FormHelper()
+    form.helper.use_fragment_cache = True
+    for name, value in helper_attributes.items():
+        setattr(form.helper, name, value)
+    html = template.render(Context({'form': form, 'csrf_token': SimpleLazyObject(get_token)}))
+
+    # The token is only generated for forms outputting it, and never cached
+    assert ('value="secret-token"' in html) is with_csrf_token
+    assert bool(read) is with_csrf_token
+    assert len(caches['default']._cache) == 1
+    assert 'secret-token' not in str(list(caches['default']._cache.values()))
+
+
+@pytest.mark.parametrize('html', [layout.HTML('<p>Hello {{ user }}</p>'), CrispyHTML('<p>Hello {{ user }}</p>')])
+def test_crispy_fragment_cache_context(html):
+    caches['default'].clear()
+    template = Template("""
+        {% load crispy_forms_bootstrap2 %}
+        {% crispy form %}
+    """)
+
+    def render(user, **helper_attributes):
+        form = SampleForm()
+        form.helper = FormHelper()
+        form.helper.use_fragment_cache = True
+        form.helper.layout = layout.Layout(layout.Div(html, 'email'))
+        for name, value in helper_attributes.items():
+            setattr(form.helper, name, value)
+        return template.render(Context({'form': form, 'user': user}))
+
+    # Strings rendered against the context aren't cached
+    assert 'Hello alice' in render('alice')
+    assert 'Hello bob' in render('bob')
+    assert len(caches['default']._cache) == 0
+
+    # Unless the helper lists the context variables they depend on
+    assert 'Hello alice' in render('alice', fragment_cache_vary_on=['user'])
+    assert 'Hello bob' in render('bob', fragment_cache_vary_on=['user'])
+    assert len(caches['default']._cache) == 2
+    assert 'Hello bob' in render('bob', fragment_cache_vary_on=['user'])
+    assert len(caches['default']._cache) == 2
+
+    # Submit values are checked as well
+    assert utils.get_fragment_cache_key(SampleForm(), FormHelper(), 'bootstrap', False) is not None
+    helper = FormHelper()
+    helper.add_input(layout.Submit('save', 'Save {{ user }}'))
+    assert utils.get_fragment_cache_key(SampleForm(), helper, 'bootstrap', False) is None
+
+
+class ColorForm(SampleForm):
+    color = forms.ChoiceField(choices=())
+
+    def __init__(self, colors, *args, **kwargs):
+        super(ColorForm, self).__init__(*args, **kwargs)
+        self.fields['color'].choices = [(color, color.title()) for color in colors]
+        self.fields['email'].widget.attrs['placeholder'] = colors[0]
+
+
+@pytest.mark.django_db
+def test_crispy_fragment_cache_fields():
+    caches['default'].clear()
+    template = Template("""
+        {% load crispy_forms_bootstrap2 %}
+        {% crispy form %}
+    """)
+
+    def render(form):
+        form.helper = FormHelper()
+        form.helper.use_fragment_cache = True
+        return template.render(Context({'form': form}))
+
+    # Fields changed by `__init__` are part of the key
+    html = render(ColorForm(['red', 'blue']))
+    assert '>Blue</option>' in html and 'placeholder="red"' in html
+    html = render(ColorForm(['green']))
+    assert '>Green</option>' in html and 'Blue' not in html and 'placeholder="green"' in html
+    assert len(caches['default']._cache) == 2
+
+    # Choices computed when rendered aren't cached
+    form = SampleForm()
+    form.fields['color'] = forms.ChoiceField(choices=lambda: [('red', 'Red')])
+    assert utils.get_fragment_cache_key(form, FormHelper(), 'bootstrap', False) is None
+    form = SampleForm()
+    form.fields['permission'] = forms.ModelChoiceField(queryset=Permission.objects.all())
+    assert utils.get_fragment_cache_key(form, FormHelper(), 'bootstrap', False) is None
+    assert '<select name="permission"' in render(form)
+    assert len(caches['default']._cache) == 2
@@ -1,6 +1,8 @@
 # -*- coding: utf-8 -*-
 from __future__ import unicode_literals
 
+from importlib import import_module
+
 import pytest
 
 import django
@@ -8,8 +10,14 @@ from django import forms
 from django.template.base import Context, Template
 
 from crispy_forms.helper import FormHelper
-from crispy_forms.layout import Layout
-from crispy_forms.utils import list_difference, list_intersection, render_field
+from crispy_forms.layout import HTML, Fieldset, Layout, Submit
+from crispy_forms.utils import list_difference, list_intersection, render_crispy_form, render_field
+
+from .forms import SampleForm
+
+# The app directory is not a valid identifier, so it can't be imported relatively
+utils = import_module('crispy-forms-bootstrap2.utils')
+layout = import_module('crispy-forms-bootstrap2.layout')
 
 
 def test_list_intersection():
@@ -52,3 +60,104 @@ def test_custom_bound_field():
     rendered = template.render(Context({'form': MyForm(data={'f': 'something'})}))
 
     assert extra in rendered
+
+
+def test_compiled_template_cache():
+    utils.clear_compiled_template_cache()
+    template = utils.get_compiled_template('{{ name }}')
+
+    assert utils.get_compiled_template('{{ name }}') is template
+    assert template.render(Context({'name': 'crispy'})) == 'crispy'
+
+    info = utils.compiled_template_cache_info()
+    assert info.hits == 1
+    assert info.misses == 1
+
+
+def test_compiled_template_cache_size(settings):
+    settings.CRISPY_TEMPLATE_CACHE_SIZE = 2
+    for source in ('first', 'second', 'third'):
+        utils.get_compiled_template(source)
+
+    info = utils.compiled_template_cache_info()
+    assert info.maxsize == 2
+    assert info.currsize == 2
+
+
+def test_template_pack_setting(settings):
+    assert utils.get_template_pack() == 'bootstrap'
+    assert layout.Submit('save', 'save').field_classes == 'btn btn-primary'
+    assert layout.Row('email').css_class == 'row'
+
+    settings.CRISPY_TEMPLATE_PACK = 'uni_form'
+    assert utils.get_template_pack() == 'uni_form'
+    assert layout.Submit('save', 'save').field_classes == 'submit submitButton'
+    assert layout.Reset('reset', 'reset').field_classes == 'reset resetButton'
+    assert layout.Row('email').css_class == 'formRow'
+
+    settings.CRISPY_TEMPLATE_PACK = 'bootstrap4'
+    assert layout.Button('button', 'button').field_classes == 'btn'
+    assert layout.Row('email').css_class == 'form-row'
+
+
+@pytest.mark.parametrize('layout', [None, Layout(Fieldset('{{ form.prefix }}', 'email'), HTML('<hr>'))])
+def test_render_crispy_forms(layout):
+    helper = FormHelper()
+    helper.layout = layout
+    helper.add_input(Submit('save', 'save'))
+    context = {'csrf_token': 'ABCDEFGHIJKLMNOPQRSTUVWXYZ012345'}
+
+    def get_forms():
+        return [
+            SampleForm(prefix='first'),
+            SampleForm({'email': 'invalid'}, prefix='second'),
+            SampleForm(prefix='third'),
+        ]
+
+    fragments = utils.render_crispy_forms(get_forms(), helper, context=context)
+
+    assert len(fragments) == 3
+    assert 'name="second-email"' in fragments[1]
+    assert fragments == [render_crispy_form(form, helper, context=context) for form in get_forms()]
+
+
+class ContextDepth(object):
+    def __init__(self):
+        self.depths = []
+
+    def render(self, form, form_style, context, template_pack=None, **kwargs):
+        self.depths.append(len(context.dicts))
+        return ''
+
+
+def test_render_crispy_forms_context_depth(monkeypatch):
+    contexts = []
+    get_node_context = utils.get_node_context
+
+    def spy_node_context(*args, **kwargs):
+        contexts.append(get_node_context(*args, **kwargs))
+        return contexts[-1]
+
+    monkeypatch.setattr(utils, 'get_node_context', spy_node_context)
+    probe = ContextDepth()
+    helper = FormHelper()
+    helper.layout = Layout(Fieldset('legend', 'email', 'password1'), 'first_name', probe)
+
+    utils.render_crispy_forms([SampleForm(prefix=str(i)) for i in range(20)], helper)
+
+    # Every form is rendered on a context as deep as the first one's, and the layers
+    # pushed while rendering are all popped
+    assert probe.depths == [probe.depths[0]] * 20
+    assert len(contexts[0].dicts) == len(get_node_context(helper, None, 'bootstrap').dicts)
+
+
+def test_render_crispy_forms_form_helper():
+    forms = [SampleForm(prefix=str(i)) for i in range(2)]
+    forms[0].helper = FormHelper()
+    forms[0].helper.form_tag = False
+
+    fragments = utils.render_crispy_forms(forms)
+
+    assert len(fragments) == 2
+    assert not any('<form' in html for html in fragments)
+    assert utils.render_crispy_forms([]) == []
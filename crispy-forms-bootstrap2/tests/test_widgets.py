@@ -0,0 +1,57 @@
+# -*- coding: utf-8 -*-
+from importlib import import_module
+
+import pytest
+
+from django import forms
+from django.template.loader import get_template
+from django.test.html import parse_html
+
+from crispy_forms.templatetags import crispy_forms_field
+
+from .forms import CheckboxesSampleForm, SampleForm
+from .utils import render_app_template
+
+widgets = import_module('crispy-forms-bootstrap2.widgets')
+
+
+class WidgetsForm(CheckboxesSampleForm, SampleForm):
+    select = forms.ChoiceField(choices=((1, 'One'), (2, 'Two')))
+    multiple = forms.MultipleChoiceField(choices=((1, 'One'), (2, 'Two')))
+
+
+def test_widget_kind():
+    form = WidgetsForm()
+    for field in form:
+        kind = widgets.get_widget_kind(field)
+        for check in ('is_checkbox', 'is_checkboxselectmultiple', 'is_radioselect', 'is_select'):
+            assert getattr(kind, check) == getattr(crispy_forms_field, check)(field)
+
+    assert widgets.get_widget_kind(form['multiple']) is widgets.WidgetKind.SELECT
+    assert widgets.get_widget_kind(form['email']) is widgets.WidgetKind.OTHER
+
+
+def test_widget_kind_cached():
+    widgets.classify_widget.cache_clear()
+    form = WidgetsForm()
+    for field in form:
+        widgets.get_widget_kind(field)
+
+    assert widgets.classify_widget.cache_info().currsize == len(set(
+        field.field.widget.__class__ for field in form
+    ))
+
+
+@pytest.mark.parametrize('template, context', [
+    ('bootstrap/field.html', {'form_show_labels': True, 'form_show_errors': True}),
+    ('bootstrap/field.html', {'form_show_labels': False}),
+    ('bootstrap/layout/multifield.html', {'labelclass': 'inline'}),
+    ('bootstrap/layout/prepended_appended_text.html', {'crispy_prepended_text': '$', 'crispy_appended_text': '.00'}),
+])
+def test_widget_kind_templates(template, context):
+    form = WidgetsForm({'email': 'invalid'})
+    for field in form:
+        html = render_app_template(template, dict(context, field=field))
+        expected = get_template(template).render(dict(context, field=field))
+
+        assert parse_html(html) == parse_html(expected)
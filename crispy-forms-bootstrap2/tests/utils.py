@@ -1,5 +1,10 @@
+import os
+
+from django.template import Context, Template
 from django.test.html import Element, parse_html
 
+TEMPLATES_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'templates')
+
 
 def contains_partial(haystack, needle):
     """Search for a html element with at least the corresponding elements
@@ -19,3 +24,12 @@ def contains_partial(haystack, needle):
         contains_partial(child, needle) for child in haystack.children
         if isinstance(child, Element)
     )
+
+
+def render_app_template(name, context):
+    """Render the app template `name`. The crispy_forms templates take precedence
+    over the app ones in the tests, so it's compiled from its file
+    """
+    with open(os.path.join(TEMPLATES_DIR, name)) as template_file:
+        template = Template(template_file.read())
+    return template.render(Context(context))
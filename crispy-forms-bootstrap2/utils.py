@@ -0,0 +1,337 @@
+import hashlib
+import pickle
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+
+from django.conf import settings
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+from django.forms.fields import CallableChoiceIterator
+from django.template import Context, Template
+from django.template.base import tag_re
+from django.template.loader import get_template
+from django.utils.functional import Promise
+from django.utils.safestring import mark_safe
+from django.utils.translation import get_language
+
+from crispy_forms.exceptions import DynamicError
+from crispy_forms.helper import FormHelper
+from crispy_forms.templatetags.crispy_forms_tags import BasicNode
+
+TEMPLATE_CACHE_SIZE = 256
+
+FRAGMENT_CACHE_KEY_PREFIX = 'crispy_forms_bootstrap2.fragment'
+
+_compiled_template = None
+
+_render_executor = None
+
+_template_pack = None
+
+
+def _get_compiled_template_cache():
+    global _compiled_template
+
+    if _compiled_template is None:
+        maxsize = getattr(settings, 'CRISPY_TEMPLATE_CACHE_SIZE', TEMPLATE_CACHE_SIZE)
+        _compiled_template = lru_cache(maxsize=maxsize)(Template)
+
+    return _compiled_template
+
+
+def get_compiled_template(source):
+    """
+    Returns a compiled `django.template.Template` for `source`.
+
+    Compiled templates are kept in a process wide LRU cache keyed by their source
+    string, so strings used by `HTML`, `Fieldset` legends or `BaseInput` values are
+    only lexed and parsed once. The size of the cache can be capped using the
+    `CRISPY_TEMPLATE_CACHE_SIZE` setting, `None` makes it unbounded.
+    """
+    return _get_compiled_template_cache()(source)
+
+
+def compiled_template_cache_info():
+    """
+    Returns a named tuple `(hits, misses, maxsize, currsize)` of the compiled
+    template cache, as `functools.lru_cache` does.
+    """
+    return _get_compiled_template_cache().cache_info()
+
+
+def clear_compiled_template_cache():
+    global _compiled_template
+    _compiled_template = None
+
+
+def get_template_pack():
+    """
+    Returns the template pack set by `CRISPY_TEMPLATE_PACK`, `bootstrap` if not set.
+    It's read from the settings once, then again only when the setting changes.
+    """
+    global _template_pack
+
+    if _template_pack is None:
+        _template_pack = getattr(settings, 'CRISPY_TEMPLATE_PACK', 'bootstrap')
+
+    return _template_pack
+
+
+def get_render_executor():
+    """
+    Returns the thread pool rendering layout subtrees in parallel, shared by the
+    whole process. Its size is set by the `CRISPY_PARALLEL_RENDER_WORKERS` setting,
+    `ThreadPoolExecutor`'s default if not set.
+    """
+    global _render_executor
+
+    if _render_executor is None:
+        _render_executor = ThreadPoolExecutor(max_workers=getattr(settings, 'CRISPY_PARALLEL_RENDER_WORKERS', None))
+
+    return _render_executor
+
+
+@lru_cache()
+def resolve_template(template, template_pack):
+    """
+    Returns the template object of a layout object's `template` for `template_pack`.
+    By caching we avoid formatting the template name and going through the template
+    loaders on every render, even when the cached loader is not configured.
+    """
+    if '%s' in template:
+        template = template % template_pack
+
+    return get_template(template)
+
+
+def render_in_context(template, context, values):
+    """
+    Renders `template` against `context` with `values` pushed as a new layer,
+    instead of copying every layer into a new dictionary with `context.flatten()`.
+    The layer is popped once rendered.
+    """
+    with context.push(values):
+        return template.template.render(context)
+
+
+def get_node_context(helper, context, template_pack, is_formset=False):
+    """
+    Returns a `Context` holding `context` and the variables `{% crispy %}` gets from
+    `helper` to render a form, or a formset if `is_formset`.
+    """
+    node_context = Context(context)
+    node_context.update(
+        BasicNode(None, None, template_pack=template_pack).get_response_dict(helper, node_context, is_formset)
+    )
+    return node_context
+
+
+def render_crispy_forms(forms, helper=None, context=None, template_pack=None):
+    """
+    Renders every form of `forms` as `render_crispy_form` does, with the same helper,
+    and returns the list of their HTML. The helper's attributes, its template and the
+    context are worked out once for all the forms, each form only being pushed on the
+    context to render its layout and template::
+
+        fragments = render_crispy_forms([ItemForm(instance=item) for item in items], helper)
+
+    Without a `helper`, the one of the first form is used.
+    """
+    forms = list(forms)
+    if helper is None:
+        helper = FormHelper() if not forms or not hasattr(forms[0], 'helper') else forms[0].helper
+    template_pack = getattr(helper, 'template_pack', None) or template_pack or get_template_pack()
+
+    template = resolve_template(getattr(helper, 'template', None) or '%s/whole_uni_form.html', template_pack)
+    node_context = get_node_context(helper, context, template_pack)
+
+    depth = len(node_context.dicts)
+    fragments = []
+    for form in forms:
+        node_context.update({'form': form, 'is_bound': form.is_bound})
+        try:
+            if helper.layout:
+                form.form_html = helper.render_layout(form, node_context, template_pack=template_pack)
+            fragments.append(template.template.render(node_context))
+        finally:
+            # `render_field` pushes layers it never pops, they're dropped along with
+            # the form's, so the context doesn't grow with every form
+            del node_context.dicts[depth:]
+    return fragments
+
+
+class FrozenDict(dict):
+    """
+    Read-only `dict`, used for the `attrs` of frozen layout objects. Copies of it
+    are regular dictionaries.
+    """
+    def _read_only(self, *args, **kwargs):
+        raise DynamicError("Attributes of a frozen layout object can't be changed")
+
+    __setitem__ = __delitem__ = clear = pop = popitem = setdefault = update = _read_only
+
+    def __reduce__(self):
+        return (self.__class__, (dict(self),))
+
+
+class TemplateString(object):
+    """
+    Wraps a string used as a template by a layout object, like `HTML` contents, a
+    `Fieldset` legend or a `BaseInput` value.
+
+    Strings without any template syntax are detected when wrapped and output as they
+    are, only strings holding template syntax are compiled and rendered against the
+    context. Lazy translations are checked when rendered, as their text depends on
+    the active language.
+    """
+    def __init__(self, source):
+        self.source = source
+        self.is_static = not isinstance(source, Promise) and tag_re.search(str(source)) is None
+
+    def render(self, context):
+        if self.is_static:
+            return mark_safe(str(self.source))
+
+        source = str(self.source)
+        if tag_re.search(source) is None:
+            return mark_safe(source)
+        return get_compiled_template(source).render(context)
+
+
+def has_template_syntax(value):
+    # `TemplateString.is_static` is false for any lazy translation, whose text is
+    # covered by the language in the key
+    if isinstance(value, TemplateString):
+        value = value.source
+    return isinstance(value, (str, Promise)) and tag_re.search(str(value)) is not None
+
+
+def is_static_layout_object(layout_object):
+    """
+    Returns whether none of the strings of `layout_object`, or of the layout objects it
+    holds, hold template syntax, which would render differently for every context.
+    """
+    for name, value in vars(layout_object).items():
+        if name == 'fields':
+            for field in value:
+                if hasattr(field, '__dict__') and not is_static_layout_object(field):
+                    return False
+        elif has_template_syntax(value):
+            return False
+    return True
+
+
+def get_choices_state(choices):
+    # Labels are turned into text, the `repr()` of lazy translations isn't stable
+    return [
+        (str(value), get_choices_state(label) if isinstance(label, (list, tuple)) else str(label))
+        for value, label in choices
+    ]
+
+
+def get_fields_state(form):
+    """
+    Returns what the definitions of `form`'s fields render, which `__init__` may change
+    per instance: their labels, help texts, flags, initial values, widgets, widget
+    attributes and choices. Returns `None` for fields whose choices or initial value
+    are computed when rendered, from a queryset or a callable.
+    """
+    state = []
+    for name, field in form.fields.items():
+        choices = getattr(field, 'choices', ())
+        if hasattr(field, 'queryset') or isinstance(choices, CallableChoiceIterator) or callable(field.initial):
+            return None
+        widgets = getattr(field.widget, 'widgets', [field.widget])
+        state.append((
+            name, field.__class__.__name__, str(field.label), str(field.help_text), field.required,
+            field.disabled, str(field.initial), field.widget.__class__.__name__,
+            [sorted((attr, str(value)) for attr, value in widget.attrs.items()) for widget in widgets],
+            get_choices_state(choices),
+        ))
+    return state
+
+
+def get_fragment_cache_key(form, helper, template_pack, with_csrf_token, context=None):
+    """
+    Returns the cache key of the fragment rendered for `form` with `helper`, or `None`
+    when it can't be cached: forms with uploaded files, forms with model choice fields
+    or fields whose choices or initial value are callables, helpers whose layout or
+    attributes can't be pickled, and helpers whose layout or inputs render strings
+    against the context, like `HTML('{{ user }}')`, unless they list the context
+    variables those depend on in `fragment_cache_vary_on`.
+
+    The key covers the form class, the helper attributes, layout and inputs, the
+    template pack, the form bound data, initial data and errors, the fields state
+    returned by `get_fields_state`, the active language, whether a CSRF token is
+    output and the `repr()` of the `fragment_cache_vary_on` variables of `context`.
+    Templates of layout objects reading other context variables must list them as well.
+
+    Other changes `__init__` makes to a form instance aren't covered, like a widget's
+    template name or the state of a custom widget. Forms making them per request
+    mustn't use the fragment cache.
+    """
+    if form.files:
+        return None
+    fields_state = get_fields_state(form)
+    if fields_state is None:
+        return None
+
+    vary_on = getattr(helper, 'fragment_cache_vary_on', None)
+    if vary_on is None:
+        layout_objects = list(helper.inputs) + ([helper.layout] if helper.layout is not None else [])
+        if not all(is_static_layout_object(layout_object) for layout_object in layout_objects):
+            return None
+    context_state = repr([(name, (context or {}).get(name)) for name in vary_on or ()])
+
+    attributes = helper.get_attributes(template_pack=template_pack)
+    # Helpers built with `FormHelper(form)` hold the form itself
+    attributes.pop('form', None)
+    try:
+        helper_state = pickle.dumps((sorted(attributes.items()), helper.layout), protocol=2)
+    except (pickle.PicklingError, TypeError, AttributeError):
+        return None
+
+    data = sorted(form.data.lists()) if hasattr(form.data, 'lists') else sorted(form.data.items())
+    errors = form.errors.as_json() if form.is_bound else ''
+    form_state = repr((data, sorted(form.initial.items()), form.prefix, form.auto_id, errors, fields_state))
+
+    key = hashlib.md5()
+    for value in (
+        '%s.%s' % (form.__class__.__module__, form.__class__.__qualname__),
+        template_pack,
+        get_language() or '',
+        str(with_csrf_token),
+        form_state,
+        context_state,
+    ):
+        key.update(value.encode('utf-8'))
+    key.update(helper_state)
+
+    return '%s.%s' % (FRAGMENT_CACHE_KEY_PREFIX, key.hexdigest())
+
+
+@receiver(setting_changed)
+def _reset_compiled_template_cache(**kwargs):
+    # Templates are compiled against the default engine, so they are stale as well
+    # when the template settings change
+    if kwargs['setting'] in ('CRISPY_TEMPLATE_CACHE_SIZE', 'TEMPLATES'):
+        clear_compiled_template_cache()
+    if kwargs['setting'] == 'TEMPLATES':
+        resolve_template.cache_clear()
+
+
+@receiver(setting_changed)
+def _reset_render_executor(**kwargs):
+    global _render_executor
+
+    if kwargs['setting'] == 'CRISPY_PARALLEL_RENDER_WORKERS' and _render_executor is not None:
+        _render_executor.shutdown(wait=False)
+        _render_executor = None
+
+
+@receiver(setting_changed)
+def _reset_template_pack(**kwargs):
+    global _template_pack
+
+    if kwargs['setting'] == 'CRISPY_TEMPLATE_PACK':
+        _template_pack = None
@@ -0,0 +1,60 @@
+from enum import Enum
+from functools import lru_cache
+
+from django import forms
+
+
+class WidgetKind(Enum):
+    """
+    Kinds of widgets the bootstrap templates lay out differently, read by them as
+    `kind.is_checkbox`, `kind.is_checkboxselectmultiple`, `kind.is_radioselect` and
+    `kind.is_select`.
+    """
+    CHECKBOX = 'checkbox'
+    CHECKBOX_SELECT_MULTIPLE = 'checkboxselectmultiple'
+    RADIO_SELECT = 'radioselect'
+    SELECT = 'select'
+    OTHER = 'other'
+
+    @property
+    def is_checkbox(self):
+        return self is WidgetKind.CHECKBOX
+
+    @property
+    def is_checkboxselectmultiple(self):
+        return self is WidgetKind.CHECKBOX_SELECT_MULTIPLE
+
+    @property
+    def is_radioselect(self):
+        return self is WidgetKind.RADIO_SELECT
+
+    @property
+    def is_select(self):
+        return self is WidgetKind.SELECT
+
+
+# Widget classes of each kind, checked in order
+WIDGET_KINDS = (
+    (forms.CheckboxInput, WidgetKind.CHECKBOX),
+    (forms.CheckboxSelectMultiple, WidgetKind.CHECKBOX_SELECT_MULTIPLE),
+    (forms.RadioSelect, WidgetKind.RADIO_SELECT),
+    (forms.Select, WidgetKind.SELECT),
+)
+
+
+@lru_cache()
+def classify_widget(widget_class):
+    """
+    Returns the `WidgetKind` of `widget_class`, computed once per class.
+    """
+    for kind_class, kind in WIDGET_KINDS:
+        if issubclass(widget_class, kind_class):
+            return kind
+    return WidgetKind.OTHER
+
+
+def get_widget_kind(field):
+    """
+    Returns the `WidgetKind` of the widget of the bound field `field`.
+    """
+    return classify_widget(field.field.widget.__class__)